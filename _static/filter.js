@@ -0,0 +1,76 @@
+// Filters movies of the current page, and finds matching movies on the
+// other pages using the JSON data shards created by web_generator.
+const movieGrid = document.querySelector(".movie-grid");
+const filterInput = document.getElementById("movie-filter");
+const filterResults = document.getElementById("filter-results");
+const currentPage = Number(movieGrid.dataset.page);
+const pageCount = Number(movieGrid.dataset.pages);
+let dataShards = null;
+
+function loadDataShards() {
+    // shards are downloaded only once, on the first filtering
+    if (!dataShards) {
+        const requests = [];
+        for (let page = 1; page <= pageCount; page++) {
+            requests.push(fetch(`data/page-${page}.json`)
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`data/page-${page}.json: ${response.status}`);
+                    }
+                    return response.json();
+                }));
+        }
+        // a failed download is tried again on the next filtering
+        dataShards = Promise.all(requests).catch(error => {
+            dataShards = null;
+            throw error;
+        });
+    }
+    return dataShards;
+}
+
+filterInput.addEventListener("input", async () => {
+    const query = filterInput.value.trim().toLowerCase();
+
+    for (const card of movieGrid.children) {
+        const title = card.querySelector(".movie-title").textContent;
+        card.hidden = !title.toLowerCase().includes(query);
+    }
+
+    filterResults.replaceChildren();
+    if (!query || pageCount === 1) {
+        return;
+    }
+
+    let shards;
+    try {
+        shards = await loadDataShards();
+    } catch (error) {
+        // browsers don't allow fetch of the shards from file:// pages
+        if (filterInput.value.trim().toLowerCase() === query) {
+            const item = document.createElement("li");
+            item.textContent = "Results from other pages are shown only " +
+                "when the website is served over HTTP";
+            filterResults.replaceChildren(item);
+        }
+        return;
+    }
+    if (filterInput.value.trim().toLowerCase() !== query) {
+        return;  // user kept typing, newer filtering will fill the results
+    }
+    for (const shard of shards) {
+        if (shard.page === currentPage) {
+            continue;
+        }
+        for (const movie of shard.movies) {
+            if (movie.title.toLowerCase().includes(query)) {
+                const link = document.createElement("a");
+                link.href = shard.file_name;
+                link.textContent = `${movie.title} (${movie.year}) - page ${shard.page}`;
+                const item = document.createElement("li");
+                item.append(link);
+                filterResults.append(item);
+            }
+        }
+    }
+});
@@ -0,0 +1,71 @@
+"""
+Compares serial and parallel website generation on a synthetic library.
+Both builds run in temporary folders without fragment cache, and their
+generated files are checked to be the same.
+
+usage: python benchmarks/bench_parallel_web.py [--size 100000] [--workers 4]
+"""
+import argparse
+import filecmp
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import web_generator
+from synthetic_library import generate_library
+
+
+def build_site(movies: dict, workers: int, build_dir: str) -> float:
+    """generates the website in build_dir, returns build time in seconds"""
+    os.makedirs(os.path.join(build_dir, "_static"))
+    shutil.copy(os.path.join(REPO_DIR, web_generator.TEMPLATE_PATH),
+                os.path.join(build_dir, web_generator.TEMPLATE_PATH))
+    current_dir = os.getcwd()
+    os.chdir(build_dir)
+    try:
+        start_time = time.perf_counter()
+        web_generator.generate_web(movies, workers=workers)
+        return time.perf_counter() - start_time
+    finally:
+        os.chdir(current_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark of serial vs parallel website generation")
+    parser.add_argument("--size", type=int, default=100_000,
+                        help="number of movies in the synthetic library")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of processes for the parallel build")
+    args = parser.parse_args()
+
+    movies = generate_library(args.size)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        serial_dir = os.path.join(temp_dir, "serial")
+        parallel_dir = os.path.join(temp_dir, "parallel")
+        serial_time = build_site(movies, 1, serial_dir)
+        parallel_time = build_site(movies, args.workers, parallel_dir)
+
+        comparison = filecmp.dircmp(os.path.join(serial_dir, "_static"),
+                                    os.path.join(parallel_dir, "_static"))
+        pages = [name for name in comparison.common_files
+                 if name.endswith(".html")]
+        _, mismatch, errors = filecmp.cmpfiles(comparison.left,
+                                               comparison.right, pages,
+                                               shallow=False)
+
+    print(f"movies: {args.size}, workers: {args.workers}")
+    print(f"serial:   {serial_time:.2f}s")
+    print(f"parallel: {parallel_time:.2f}s")
+    print(f"speedup:  {serial_time / parallel_time:.2f}x")
+    print("output identical" if not (mismatch or errors)
+          else f"output differs: {mismatch + errors}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Load test of the HTTP API started with `python main.py serve`.
+Keeps --connections keep-alive connections busy for --duration seconds
+and prints requests per second and latency percentiles.
+
+usage: python benchmarks/load_test_server.py --port 8000 --path /stats
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+
+async def run_connection(host: str, port: int, path: str, deadline: float,
+                         latencies: list) -> None:
+    """sends requests on one connection until deadline, adds latencies"""
+    reader, writer = await asyncio.open_connection(host, port)
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+    try:
+        while time.perf_counter() < deadline:
+            start_time = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+
+            content_length = 0
+            while True:
+                header_line = await reader.readline()
+                if header_line in (b"\r\n", b""):
+                    break
+                name, _, value = header_line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    content_length = int(value)
+            await reader.readexactly(content_length)
+            latencies.append(time.perf_counter() - start_time)
+    finally:
+        writer.close()
+
+
+async def load_test(host: str, port: int, path: str, connections: int,
+                    duration: float) -> list:
+    """runs the connections concurrently, returns latencies of requests"""
+    latencies = []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(run_connection(host, port, path, deadline,
+                                          latencies)
+                           for _ in range(connections)))
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of movie server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--path", default="/stats",
+                        help="GET endpoint to load, for example /search?q=king")
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    latencies = asyncio.run(load_test(args.host, args.port, args.path,
+                                      args.connections, args.duration))
+    if not latencies:
+        print("no requests completed")
+        return
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f"requests: {len(latencies)}")
+    print(f"requests/sec: {len(latencies) / args.duration:.1f}")
+    print(f"p50: {percentiles[49] * 1000:.2f}ms")
+    print(f"p99: {percentiles[98] * 1000:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
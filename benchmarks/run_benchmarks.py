@@ -0,0 +1,231 @@
+"""
+Benchmarks of storage, search, statistics and website generation on
+seeded synthetic libraries. Results can be saved as a JSON baseline, and
+compared with a saved baseline to find regressions.
+
+usage:
+    python benchmarks/run_benchmarks.py --sizes 1000 100000 --save base.json
+    python benchmarks/run_benchmarks.py --sizes 1000 100000 --compare base.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import flags_api_handler
+import web_generator
+from movie_app import MovieApp
+from storage_csv import StorageCsv
+from storage_json import StorageJson
+from synthetic_library import COUNTRIES, generate_library
+
+DEFAULT_SIZES = [1000, 100_000]
+DEFAULT_ROUNDS = 3
+DEFAULT_THRESHOLD = 0.2
+SEED = 0
+NEW_MOVIE = {"Title": "12 Angry Men", "imdbRating": "9.0", "Year": "1957",
+             "Poster": "https://m.media-amazon.com/images/M/MV5B@._V1_SX300.jpg",
+             "imdbID": "tt0050083", "Country": "United States"}
+
+
+def measure(function, rounds: int, setup=None) -> dict:
+    """runs function rounds times, returns min and median time in seconds"""
+    times = []
+    for _ in range(rounds):
+        if setup:
+            setup()
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+
+    return {"min": min(times), "median": statistics.median(times),
+            "rounds": rounds}
+
+
+def benchmark_storage(storage_class, movies: dict, work_dir: str,
+                      rounds: int) -> dict:
+    """benchmarks load, add, delete and update of the storage"""
+    storage = storage_class(os.path.join(work_dir, "library"))
+    storage._save_data(movies)
+    existing_movie = next(iter(movies))
+
+    def reset_library():
+        storage._save_data(movies)
+
+    return {
+        "load_data": measure(storage.load_data, rounds),
+        "add_movie": measure(lambda: storage.add_movie(NEW_MOVIE), rounds,
+                             reset_library),
+        "delete_movie": measure(lambda: storage.delete_movie(existing_movie),
+                                rounds, reset_library),
+        "update_movie": measure(
+            lambda: storage.update_movie(existing_movie, "note"), rounds,
+            reset_library)}
+
+
+def benchmark_movie_app(movies: dict, rounds: int) -> dict:
+    """benchmarks search and statistics of the movie app"""
+    movie_app = MovieApp(None)
+    return {
+        "fuzzy_search": measure(
+            lambda: movie_app._search_movie_by_fuzzy_matching(movies,
+                                                              "dark nigt"),
+            rounds),
+        "part_name_search": measure(
+            lambda: movie_app._search_movie_by_part_name(movies, "king"),
+            rounds),
+        "statistics": measure(
+            lambda: movie_app._create_str_for_statistics(movies), rounds)}
+
+
+def benchmark_website(movies: dict, work_dir: str, rounds: int) -> dict:
+    """benchmarks full website generation and rebuild after one change"""
+    static_dir = os.path.join(work_dir, "_static")
+    os.makedirs(os.path.join(work_dir, flags_api_handler.FLAGS_DIR))
+    shutil.copy(os.path.join(REPO_DIR, web_generator.TEMPLATE_PATH),
+                os.path.join(work_dir, web_generator.TEMPLATE_PATH))
+    # placeholder flags, so the benchmark doesn't download them
+    for country in COUNTRIES:
+        country_code = flags_api_handler.get_flag_country_code(country)
+        flag_path = os.path.join(work_dir, flags_api_handler.FLAGS_DIR,
+                                 f"{country_code}.png")
+        with open(flag_path, "wb") as file:
+            file.write(b"flag")
+
+    changed_movies = dict(movies)
+    changed_movie = next(iter(movies))
+    changed_movies[changed_movie] = {**movies[changed_movie], "note": "new"}
+
+    def remove_generated_site():
+        shutil.rmtree(os.path.join(work_dir, "_cache"), ignore_errors=True)
+        shutil.rmtree(os.path.join(static_dir, "data"), ignore_errors=True)
+
+    def build_site():
+        web_generator.generate_web(movies)
+
+    def rebuild_changed_site():
+        web_generator.generate_web(changed_movies)
+
+    current_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        results = {"generate_web": measure(build_site, rounds,
+                                           remove_generated_site)}
+        results["generate_web_one_change"] = measure(rebuild_changed_site,
+                                                     rounds, build_site)
+    finally:
+        os.chdir(current_dir)
+
+    # rebuild after one change has to stay much cheaper than the full build,
+    # its share is compared with the baseline like the times
+    results["one_change_ratio"] = {
+        statistic: results["generate_web_one_change"][statistic]
+        / results["generate_web"][statistic]
+        for statistic in ("min", "median")}
+    results["one_change_ratio"]["rounds"] = rounds
+    return results
+
+
+def run_benchmarks(sizes: list, rounds: int) -> dict:
+    """runs all the benchmarks for every library size"""
+    results = {}
+    for size in sizes:
+        print(f"benchmarking library of {size} movies...")
+        movies = generate_library(size, SEED)
+        with tempfile.TemporaryDirectory() as work_dir:
+            size_results = {
+                **{f"storage_json.{name}": result for name, result in
+                   benchmark_storage(StorageJson, movies, work_dir,
+                                     rounds).items()},
+                **{f"storage_csv.{name}": result for name, result in
+                   benchmark_storage(StorageCsv, movies, work_dir,
+                                     rounds).items()},
+                **{f"movie_app.{name}": result for name, result in
+                   benchmark_movie_app(movies, rounds).items()},
+                **{f"web_generator.{name}": result for name, result in
+                   benchmark_website(movies, work_dir, rounds).items()}}
+
+        for name, result in size_results.items():
+            results[f"{name}[{size}]"] = result
+
+    return results
+
+
+def compare_results(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Returns list of benchmark names that are slower than in baseline by
+    more than threshold (0.2 is 20%), compared by the minimal time.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        baseline_time = baseline[name]["min"]
+        change = (result["min"] - baseline_time) / baseline_time
+        status = "REGRESSION" if change > threshold else "ok"
+        unit = get_unit(name)
+        print(f"{name:<45} {baseline_time:>10.4f}{unit} -> "
+              f"{result['min']:>10.4f}{unit} {change:>+8.1%}  {status}")
+        if change > threshold:
+            regressions.append(name)
+
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    """prints results table"""
+    for name, result in results.items():
+        unit = get_unit(name)
+        print(f"{name:<45} min {result['min']:>10.4f}{unit}"
+              f"  median {result['median']:>10.4f}{unit}")
+
+
+def get_unit(name: str) -> str:
+    """returns unit of the benchmark result, ratios have no unit"""
+    return "x" if "ratio" in name else "s"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks of the movie app on synthetic libraries")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="library sizes, for example 1000 100000 1000000")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS,
+                        help="number of runs of every benchmark")
+    parser.add_argument("--save", metavar="FILE",
+                        help="save results as JSON baseline")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="compare results with JSON baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown in comparison, 0.2 is 20%%")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.rounds)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({"python": platform.python_version(),
+                       "platform": platform.platform(),
+                       "seed": SEED,
+                       "results": results}, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            baseline = json.load(file)["results"]
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions above {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""
+Generates synthetic movie libraries in the storage format, used by
+the benchmarks. The same size and seed always give the same library.
+"""
+import random
+
+COUNTRIES = ["United States", "United Kingdom", "France", "Germany", "Italy",
+             "Japan", "India", "Spain", "Canada", "Russia",
+             "United States, United Kingdom"]
+WORDS = ["The", "Dark", "Last", "Night", "King", "Return", "Red", "City",
+         "Story", "Lost", "Love", "Dead", "Star", "War", "River", "Ghost",
+         "Silent", "Empire", "Golden", "Shadow", "Man", "Woman", "Game"]
+POSTER_URL = "https://m.media-amazon.com/images/M/MV5B{}@._V1_SX300.jpg"
+
+
+def generate_library(size: int, seed: int = 0) -> dict:
+    """returns dict of size synthetic movies, in the load_data format"""
+    randomizer = random.Random(seed)
+    movies = {}
+
+    for index in range(size):
+        title_words = randomizer.choices(WORDS, k=randomizer.randint(1, 4))
+        title = f"{' '.join(title_words)} {index}"
+        movies[title] = {
+            "rating": round(randomizer.uniform(1, 10), 1),
+            "year": randomizer.randint(1920, 2023),
+            "image": POSTER_URL.format(randomizer.getrandbits(64)),
+            "imdb_id": f"tt{index:07d}",
+            "country": randomizer.choice(COUNTRIES)}
+
+    return movies
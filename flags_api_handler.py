@@ -1,17 +1,37 @@
+import base64
+import concurrent.futures
+import functools
+import os
 import pycountry
+import requests
 
+FLAG_URL = "https://www.countryflagicons.com/FLAT/24/{}.png"
+FLAGS_DIR = os.path.join("_static", "flags")
+FLAGS_SPRITE_PATH = os.path.join("_static", "flags.css")
+DOWNLOAD_TIMEOUT = 10
+MAX_DOWNLOADS = 8
 
-def get_flag_html_link(country_name: str) -> str:
-    """returns country flag picture link"""
+# flags that couldn't be downloaded, they aren't requested again by this process
+_failed_flag_codes = set()
+
+
+def get_flag_css_class(country_name: str) -> str:
+    """returns css class of the country flag in the flags sprite"""
+    country_code = get_flag_country_code(country_name)
+    if country_code:
+        return f"flag-{country_code.lower()}"
+
+
+def get_flag_country_code(country_name: str) -> str:
+    """returns country code of the first country in the country_name list"""
     country_name = country_name.split(",")[0]
     country_code = get_country_code(country_name)
     if not country_code and country_name == "Russia":
         country_code = "RU"
-    url = f"https://www.countryflagicons.com/FLAT/24/{country_code}.png"
-    if country_code:
-        return url
+    return country_code
 
 
+@functools.lru_cache(maxsize=None)
 def get_country_code(country_name):
     """Returns the ISO 3166-1 alpha-2 country code for the given country name."""
     try:
@@ -19,3 +39,66 @@ def get_country_code(country_name):
         return country.alpha_2
     except AttributeError:
         return None
+
+
+def build_flags_sprite(country_codes) -> None:
+    """
+    Creates flags.css in _static with one css class per country flag.
+    Every flag is embedded in the stylesheet, so the browser downloads all
+    the flags of the page with a single request. Downloaded flags are kept
+    in _static/flags, missing ones are downloaded at most MAX_DOWNLOADS
+    at the same time. The stylesheet is rewritten only when it changes.
+    """
+    country_codes = sorted(set(country_codes))
+    missing_codes = [country_code for country_code in country_codes
+                     if not os.path.exists(_get_flag_path(country_code))
+                     and country_code not in _failed_flag_codes]
+    if missing_codes:
+        with concurrent.futures.ThreadPoolExecutor(MAX_DOWNLOADS) as executor:
+            list(executor.map(_download_flag, missing_codes))
+
+    css_rules = []
+    for country_code in country_codes:
+        flag_png = _load_flag_png(country_code)
+        if flag_png:
+            encoded_flag = base64.b64encode(flag_png).decode("ascii")
+            css_rules.append(f".flag-{country_code.lower()} {{background-image:"
+                             f" url(data:image/png;base64,{encoded_flag});}}")
+    sprite = "\n".join(css_rules) + "\n"
+
+    if os.path.exists(FLAGS_SPRITE_PATH):
+        with open(FLAGS_SPRITE_PATH, "r") as file:
+            if file.read() == sprite:
+                return
+    with open(FLAGS_SPRITE_PATH, "w") as file:
+        file.write(sprite)
+
+
+def _get_flag_path(country_code: str) -> str:
+    """returns path of the flag png in local flags folder"""
+    return os.path.join(FLAGS_DIR, f"{country_code}.png")
+
+
+def _load_flag_png(country_code: str) -> bytes:
+    """returns flag png from local flags folder, None if it's missing"""
+    try:
+        with open(_get_flag_path(country_code), "rb") as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def _download_flag(country_code: str) -> None:
+    """downloads flag png to local flags folder, remembers failed codes"""
+    try:
+        with requests.get(FLAG_URL.format(country_code),
+                          timeout=DOWNLOAD_TIMEOUT) as res:
+            res.raise_for_status()
+            flag_png = res.content
+    except requests.exceptions.RequestException:
+        _failed_flag_codes.add(country_code)
+        return
+
+    os.makedirs(FLAGS_DIR, exist_ok=True)
+    with open(_get_flag_path(country_code), "wb") as file:
+        file.write(flag_png)
@@ -0,0 +1,109 @@
+"""
+Renders histograms of the movies library to PNG files: by rating bins,
+by decade and by country. Rendering uses the headless Agg backend and a
+single matplotlib figure that is reused for all the requested variants.
+Rendered PNGs are cached by the digest of the plotted data, so a histogram
+of an unchanged library is copied from the cache instead of being drawn.
+The cache keeps only the HISTOGRAM_CACHE_SIZE most recently used PNGs.
+"""
+import collections
+import hashlib
+import json
+import os
+import shutil
+import matplotlib
+
+matplotlib.use("Agg")
+
+from matplotlib.figure import Figure
+
+HISTOGRAM_CACHE_DIR = os.path.join("_cache", "histograms")
+RATING_BINS = [0, 1, 2, 3, 4, 5, 6.5, 7.5, 8, 8.5, 9, 10]
+TOP_COUNTRIES = 15
+FIGURE_SIZE = (10, 7)
+VARIANTS = ("rating", "decade", "country")
+# cached PNGs of the last few libraries, older ones are removed
+HISTOGRAM_CACHE_SIZE = 30
+
+
+def render_histograms(movies: dict, file_paths: dict) -> None:
+    """
+    Renders histograms of movies in one pass. file_paths is dict of the
+    variant ("rating", "decade" or "country") to its PNG file path.
+    """
+    charts_data = extract_charts_data(movies)
+    figure = None
+
+    for variant, file_path in file_paths.items():
+        chart_data = charts_data[variant]
+        cache_path = os.path.join(HISTOGRAM_CACHE_DIR,
+                                  f"{get_chart_digest(variant, chart_data)}.png")
+
+        if os.path.exists(cache_path):
+            # modification time of the cached PNG is the time of its last use
+            os.utime(cache_path)
+        else:
+            if figure is None:
+                figure = Figure(figsize=FIGURE_SIZE)
+            figure.clear()
+            draw_chart(figure, variant, chart_data)
+            os.makedirs(HISTOGRAM_CACHE_DIR, exist_ok=True)
+            figure.savefig(cache_path, format="png")
+
+        shutil.copyfile(cache_path, file_path)
+
+    if figure is not None:
+        prune_histogram_cache()
+
+
+def prune_histogram_cache() -> None:
+    """removes cached PNGs except the most recently used ones"""
+    cache_paths = [os.path.join(HISTOGRAM_CACHE_DIR, file_name)
+                   for file_name in os.listdir(HISTOGRAM_CACHE_DIR)]
+    cache_paths.sort(key=os.path.getmtime, reverse=True)
+    for cache_path in cache_paths[HISTOGRAM_CACHE_SIZE:]:
+        os.remove(cache_path)
+
+
+def extract_charts_data(movies: dict) -> dict:
+    """
+    Returns data of every histogram variant, extracted from movies in one
+    pass: ratings and bins for "rating" and "decade", counts of movies
+    by country for "country".
+    """
+    ratings, decades = [], []
+    countries = collections.Counter()
+    for data in movies.values():
+        ratings.append(data["rating"])
+        decades.append(data["year"] // 10 * 10)
+        countries[data["country"].split(",")[0]] += 1
+
+    decade_bins = list(range(min(decades, default=0),
+                             max(decades, default=0) + 20, 10))
+    return {"rating": {"values": sorted(ratings), "bins": RATING_BINS},
+            "decade": {"values": sorted(decades), "bins": decade_bins},
+            "country": {"counts": countries.most_common(TOP_COUNTRIES)}}
+
+
+def get_chart_digest(variant: str, chart_data: dict) -> str:
+    """returns hash of the chart, used as the name of the cached PNG"""
+    chart_key = json.dumps([variant, FIGURE_SIZE, chart_data], sort_keys=True)
+    return hashlib.sha256(chart_key.encode()).hexdigest()
+
+
+def draw_chart(figure: Figure, variant: str, chart_data: dict) -> None:
+    """draws histogram variant on the figure"""
+    plot_axes = figure.add_subplot()
+    if variant == "country":
+        countries = [country for country, _ in chart_data["counts"]]
+        counts = [count for _, count in chart_data["counts"]]
+        plot_axes.bar(countries, counts)
+        plot_axes.tick_params(axis="x", labelrotation=45)
+    else:
+        plot_axes.hist(chart_data["values"], bins=chart_data["bins"])
+    # the reused figure keeps its margins, so they are always set
+    figure.subplots_adjust(
+        bottom=0.25 if variant == "country"
+        else matplotlib.rcParams["figure.subplot.bottom"])
+    plot_axes.set_xlabel(variant.capitalize())
+    plot_axes.set_ylabel("Movies")
@@ -0,0 +1,68 @@
+import os
+import metrics
+from istorage import IStorage
+
+
+class InstrumentedStorage(IStorage):
+    """
+    InstrumentedStorage class provides implementation for the IStorage
+    interface that wraps another storage and records metrics of every call:
+    duration, bytes read and written and number of records touched.
+    The wrapped storage has to keep its data in file_path.
+    """
+    def __init__(self, storage: IStorage):
+        self._storage = storage
+
+    @property
+    def file_path(self):
+        return self._storage.file_path
+
+    def load_data(self) -> dict:
+        """Loads movies from the wrapped storage and records metrics."""
+        with metrics.timer("storage_operation_duration_seconds",
+                           operation="load_data"):
+            movies = self._storage.load_data()
+        self._record_io("load_data", self._file_size(), 0, len(movies))
+        return movies
+
+    def add_movie(self, data: dict) -> None:
+        """Adds movie to the wrapped storage and records metrics."""
+        self._call_and_record("add_movie", self._storage.add_movie, data)
+
+    def delete_movie(self, title: str) -> None:
+        """Deletes movie from the wrapped storage and records metrics."""
+        self._call_and_record("delete_movie", self._storage.delete_movie,
+                              title)
+
+    def update_movie(self, title: str, note: str) -> None:
+        """Updates movie in the wrapped storage and records metrics."""
+        self._call_and_record("update_movie", self._storage.update_movie,
+                              title, note)
+
+    def _call_and_record(self, operation: str, method, *args) -> None:
+        """
+        Calls method of the wrapped storage that loads the whole file and
+        saves it again, and records metrics of it.
+        """
+        bytes_read = self._file_size()
+        with metrics.timer("storage_operation_duration_seconds",
+                           operation=operation):
+            method(*args)
+        self._record_io(operation, bytes_read, self._file_size(), 1)
+
+    def _record_io(self, operation: str, bytes_read: int, bytes_written: int,
+                   records: int) -> None:
+        """adds bytes and records of the operation to metrics counters"""
+        metrics.increment("storage_read_bytes_total", bytes_read,
+                          operation=operation)
+        metrics.increment("storage_written_bytes_total", bytes_written,
+                          operation=operation)
+        metrics.increment("storage_records_total", records,
+                          operation=operation)
+
+    def _file_size(self) -> int:
+        """returns size of the storage file in bytes"""
+        try:
+            return os.path.getsize(self.file_path)
+        except OSError:
+            return 0
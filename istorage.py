@@ -6,6 +6,17 @@ module is to ensure all storage types have a consistent interface.
 from abc import ABC, abstractmethod
 
 
+def create_movie_record(data: dict) -> dict:
+    """
+    Returns record of the movie that storages save, created from the movie
+    data of OMDb. Used by every storage and by the movies kept in memory
+    of the server, so they are always the same.
+    """
+    return {"rating": float(data["imdbRating"]), "year": int(data["Year"]),
+            "image": data["Poster"], "imdb_id": data["imdbID"],
+            "country": data["Country"]}
+
+
 class IStorage(ABC):
     """
     abstract base class that defines a generic interface for movie storage.
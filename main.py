@@ -1,5 +1,13 @@
 import argparse
+import atexit
+import signal
+import metrics
+from profiler import CommandProfiler, PROFILE_DIR, TOP_FUNCTIONS
+from instrumented_storage import InstrumentedStorage
 from movie_app import MovieApp
+from movie_server import MovieServer, HOST, PORT
+from site_watcher import SiteWatcher
+from web_generator import PAGE_SIZE
 from storage_json import StorageJson
 from storage_csv import StorageCsv
 import os
@@ -20,12 +28,47 @@ def main():
     parser = argparse.ArgumentParser(
         description='This script runs a MovieApp with a specified'
                     ' storage type and file name.')
+    parser.add_argument('mode', nargs='?', choices=['cli', 'serve', 'watch'],
+                        default='cli',
+                        help='cli runs the interactive menu (default), serve '
+                             'runs HTTP JSON API, watch regenerates the '
+                             'website when the storage file changes')
+    parser.add_argument('--host', default=HOST,
+                        help='Host of the HTTP API in serve mode')
+    parser.add_argument('--port', type=int, default=PORT,
+                        help='Port of the HTTP API in serve mode')
     parser.add_argument('--file_name', metavar='F', type=str,
                         help='The file name with extension '
                              'example filename.json or filename.csv')
+    parser.add_argument('--local_posters', action='store_true',
+                        help='Download posters and use local thumbnails '
+                             'in the generated website')
+    parser.add_argument('--page_size', metavar='N', type=int,
+                        default=PAGE_SIZE,
+                        help='Number of movies on one page of the website')
+    parser.add_argument('--metrics', metavar='FILE', type=str,
+                        help='Collect timing metrics and save them to FILE '
+                             'on exit, or on SIGUSR1 signal')
+    parser.add_argument('--metrics_format', choices=['json', 'prometheus'],
+                        default='json', help='Format of the metrics file')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile every executed command of cli mode')
+    parser.add_argument('--profile_mode', choices=['cprofile', 'sampling'],
+                        default='cprofile',
+                        help='Profile with cProfile (default), or with '
+                             'pyinstrument sampling profiler')
+    parser.add_argument('--profile_dir', metavar='DIR', default=PROFILE_DIR,
+                        help='Folder for the profiles and their summary')
+    parser.add_argument('--profile_top', metavar='N', type=int,
+                        default=TOP_FUNCTIONS,
+                        help='Number of hottest functions in the summary')
 
     # Parse the command line arguments
     args = parser.parse_args()
+    if args.page_size < 1:
+        parser.error("--page_size must be a positive number")
+    if args.profile and args.mode != 'cli':
+        parser.error("--profile works only in cli mode")
 
     # If file argument is provided, use it to set file name and extension
     if args.file_name:
@@ -34,9 +77,43 @@ def main():
 
     # Creating storage and run the app
     storage = (StorageCsv if file_ext == ".csv" else StorageJson)(file_name)
-    movie_app = MovieApp(storage)
+    if args.metrics:
+        storage = InstrumentedStorage(storage)
+        enable_metrics(args.metrics, args.metrics_format)
+    if args.mode == 'serve':
+        MovieServer(storage, page_size=args.page_size).run(args.host,
+                                                           args.port)
+        return
+    if args.mode == 'watch':
+        SiteWatcher(storage, page_size=args.page_size,
+                    local_posters=args.local_posters).run()
+        return
+
+    profiler = create_profiler(args) if args.profile else None
+    movie_app = MovieApp(storage, local_posters=args.local_posters,
+                         page_size=args.page_size, profiler=profiler)
     movie_app.run()
 
 
+def enable_metrics(file_path: str, metrics_format: str) -> None:
+    """Starts collecting metrics, they are saved to file_path on exit
+    and when the process receives SIGUSR1"""
+    metrics.enable()
+    atexit.register(metrics.dump, file_path, metrics_format)
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda *_: metrics.dump_in_thread(
+            file_path, metrics_format))
+
+
+def create_profiler(args) -> CommandProfiler:
+    """Creates command profiler, its summary is saved on exit"""
+    profiler = CommandProfiler(args.profile_dir, args.profile_top,
+                               sampling=args.profile_mode == 'sampling')
+    if args.profile_mode == 'sampling' and not profiler.sampling:
+        print("pyinstrument is not installed, profiling with cProfile")
+    atexit.register(profiler.save_summary)
+    return profiler
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,198 @@
+"""
+Lightweight in-process metrics: timing histograms and counters for menu
+commands, storage operations, OMDb requests and website builds.
+Metrics are disabled by default, then timers and counters return right
+away. Collected metrics can be exported as JSON or Prometheus text.
+"""
+import contextlib
+import functools
+import json
+import math
+import threading
+import time
+
+# upper bounds of histogram buckets, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+           math.inf)
+
+_enabled = False
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+
+
+class Histogram:
+    """cumulative histogram of observed values, in Prometheus style"""
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.bucket_counts = [0] * len(BUCKETS)
+
+    def observe(self, value: float) -> None:
+        """adds value to the histogram"""
+        self.count += 1
+        self.sum += value
+        for index, upper_bound in enumerate(BUCKETS):
+            if value <= upper_bound:
+                self.bucket_counts[index] += 1
+
+    def to_dict(self) -> dict:
+        """returns histogram data as dict"""
+        return {"count": self.count, "sum": self.sum,
+                "buckets": {_format_bound(upper_bound): count for
+                            upper_bound, count in
+                            zip(BUCKETS, self.bucket_counts)}}
+
+
+def enable() -> None:
+    """starts collecting metrics"""
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """stops collecting metrics"""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """returns True if metrics are collected"""
+    return _enabled
+
+
+def reset() -> None:
+    """removes all collected metrics"""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """adds value to histogram with name and labels"""
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        if key not in _histograms:
+            _histograms[key] = Histogram()
+        _histograms[key].observe(value)
+
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    """increments counter with name and labels by value"""
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+@contextlib.contextmanager
+def timer(name: str, **labels):
+    """context manager that adds its duration in seconds to histogram"""
+    if not _enabled:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start_time, **labels)
+
+
+def timed(name: str, **labels):
+    """decorator that adds duration of every call to histogram"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with timer(name, **labels):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def to_json() -> str:
+    """returns collected metrics as JSON"""
+    with _lock:
+        data = {"histograms": [{"name": name, "labels": dict(labels),
+                                **histogram.to_dict()}
+                               for (name, labels), histogram in
+                               _histograms.items()],
+                "counters": [{"name": name, "labels": dict(labels),
+                              "value": value}
+                             for (name, labels), value in _counters.items()]}
+    return json.dumps(data, indent=2)
+
+
+def to_prometheus() -> str:
+    """returns collected metrics in Prometheus text exposition format"""
+    lines = []
+    with _lock:
+        for name in sorted({name for name, _ in _histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (histogram_name, labels), histogram in _histograms.items():
+                if histogram_name != name:
+                    continue
+                for upper_bound, count in zip(BUCKETS,
+                                              histogram.bucket_counts):
+                    bucket_labels = labels + (("le",
+                                               _format_bound(upper_bound)),)
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)}"
+                                 f" {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)}"
+                             f" {histogram.sum}")
+                lines.append(f"{name}_count{_format_labels(labels)}"
+                             f" {histogram.count}")
+
+        for name in sorted({name for name, _ in _counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (counter_name, labels), value in _counters.items():
+                if counter_name == name:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+def dump(file_path: str, metrics_format: str = "json") -> None:
+    """saves collected metrics to file, in json or prometheus format"""
+    exported = to_prometheus() if metrics_format == "prometheus" \
+        else to_json()
+    with open(file_path, "w") as file:
+        file.write(exported)
+
+
+def dump_in_thread(file_path: str,
+                   metrics_format: str = "json") -> threading.Thread:
+    """
+    Saves collected metrics to file in a new thread and returns the thread.
+    Used from signal handlers: the signal may interrupt the code holding
+    the lock, so the handler itself must not wait for it.
+    """
+    dump_thread = threading.Thread(target=dump,
+                                   args=(file_path, metrics_format))
+    dump_thread.start()
+    return dump_thread
+
+
+def _format_bound(upper_bound: float) -> str:
+    """returns histogram bucket bound as Prometheus le label"""
+    return "+Inf" if upper_bound == math.inf else str(upper_bound)
+
+
+def _format_labels(labels: tuple) -> str:
+    """returns labels in Prometheus format: {name="value",...}"""
+    if not labels:
+        return ""
+    escaped_labels = [f'{name}="{_escape_label_value(value)}"'
+                      for name, value in labels]
+    return "{" + ",".join(escaped_labels) + "}"
+
+
+def _escape_label_value(value) -> str:
+    """escapes backslash, quote and new line in Prometheus label value"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"') \
+        .replace("\n", "\\n")
@@ -1,14 +1,15 @@
+import contextlib
 import random
-import statistics
-import numpy as np
-from matplotlib import pyplot as plt
-from fuzzywuzzy import fuzz
+import time
 import web_generator
+import histogram_renderer
 from istorage import IStorage
 import sys
 from colorama import Fore
 import os
 import omdbapi_api_handler
+import movie_queries
+import metrics
 
 
 class MovieApp:
@@ -19,8 +20,17 @@ class MovieApp:
     generating random movies, searching for movies, sorting movies by rating,
     creating rating histograms, and generating a website.
     """
-    def __init__(self, storage: IStorage):
+    def __init__(self, storage: IStorage, local_posters: bool = False,
+                 page_size: int = web_generator.PAGE_SIZE, profiler=None):
         self._storage = storage
+        # website uses posters downloaded to _static instead of remote ones
+        self._local_posters = local_posters
+        # number of movies on one page of the website
+        self._page_size = page_size
+        # optional profiler.CommandProfiler, profiles every executed command
+        self._profiler = profiler
+        # seconds the current command waited for the user input
+        self._input_duration = 0.0
         # assign clear command for command line depending on OS
         self._clear_command = "clear" if sys.platform in ["darwin",
                                                           "linux"] else "cls"
@@ -51,7 +61,27 @@ class MovieApp:
             user_input = input(
                 Fore.LIGHTBLUE_EX + "Enter choice (0-10): " + Fore.RESET)
             if user_input in self._menu_map:
-                self._menu_map[user_input]()
+                self._execute_command(user_input)
+
+    def _execute_command(self, user_input: str) -> None:
+        """
+        Executes menu command and records its duration in metrics, without
+        the time the command waited for the user input.
+        The command is profiled if the app has a profiler.
+        """
+        command = self._menu_map[user_input]
+        profile_context = self._profiler.profile(command.__name__) \
+            if self._profiler else contextlib.nullcontext()
+        self._input_duration = 0.0
+        start_time = time.perf_counter()
+        try:
+            with profile_context:
+                command()
+        finally:
+            metrics.observe("command_duration_seconds",
+                            time.perf_counter() - start_time
+                            - self._input_duration,
+                            command=command.__name__)
 
     def _exit_program(self) -> None:
         """prints a message and exits the program"""
@@ -167,29 +197,7 @@ class MovieApp:
         and the best and worst rated movies.
         """
         movies = self._storage.load_data()
-
-        if movies:
-            # getting statistics data
-            average_rating = round(
-                sum(data["rating"] for data in movies.values()) / len(movies), 1)
-            median_rating = round(
-                statistics.median(data["rating"] for data in movies.values()), 1)
-            best_movie_name = max(movies,
-                                  key=lambda movie: movies[movie]["rating"])
-            best_movie_data = {"rating": movies[best_movie_name]["rating"],
-                               "year": movies[best_movie_name]["year"]}
-            worst_movie_name = min(movies,
-                                   key=lambda movie: movies[movie]["rating"])
-            worst_movie_data = {"rating": movies[worst_movie_name]["rating"],
-                                "year": movies[worst_movie_name]["year"]}
-
-            # creating output string with statistics data
-            stats_string = f"""Average rating: {average_rating}
-Median rating: {median_rating}
-Best movie: {best_movie_name} {best_movie_data}
-Worst movie: {worst_movie_name}, {worst_movie_data}"""
-        else:
-            stats_string = self._error_text_red_color("No movies in library")
+        stats_string = self._create_str_for_statistics(movies)
 
         self._print_clear_screen_and_menu_title()
         print(stats_string)
@@ -256,19 +264,20 @@ Worst movie: {worst_movie_name}, {worst_movie_data}"""
     def _create_histogram_in_file_command(self):
         """
         Displays a menu screen with instructions to enter a file name to save
-        the histogram.Saves the histogram in a PNG file with the given name in
-        the current directory. Displays a message with the name of the file
-        where the histogram was saved.
+        the histograms. Saves the rating histogram in a PNG file with the
+        given name in the current directory, and histograms by decade and
+        by country in files with _decade and _country suffixes. Displays
+        a message with the names of the files where histograms were saved.
         """
         movies = self._storage.load_data()
         self._print_clear_screen_and_menu_title()
 
         input_file_name = self._user_input_text("Name the file to "
                                                 "save histogram: ")
-        self._create_and_save_histogram(movies, input_file_name)
+        file_paths = self._create_and_save_histogram(movies, input_file_name)
 
         self._print_clear_screen_and_menu_title()
-        print(f"Histogram saved in file named {input_file_name}")
+        print(f"Histograms saved in files named {', '.join(file_paths)}")
         self._user_input_press_enter_to_continue()
 
     def _generate_website_command(self):
@@ -276,21 +285,48 @@ Worst movie: {worst_movie_name}, {worst_movie_data}"""
         self._print_clear_screen_and_menu_title()
 
         movies = self._storage.load_data()
-        web_generator.generate_web(movies)
+        web_generator.generate_web(movies, page_size=self._page_size,
+                                   local_posters=self._local_posters)
         print("Website was generated successfully")
 
         self._user_input_press_enter_to_continue()
 
-    def _create_and_save_histogram(self, movies: dict, input_file_name: str):
-        """Creates a histogram of movie ratings and saves it to
-         a file with the input_file_name."""
-        movies_np = np.array([movies[movie]["rating"] for movie in movies])
-        _, plot_axes = plt.subplots(figsize=(10, 7))
-        plot_axes.hist(movies_np,
-                       bins=[0, 1, 2, 3, 4, 5, 6.5, 7.5, 8, 8.5, 9, 10])
+    def _create_and_save_histogram(self, movies: dict,
+                                   input_file_name: str) -> list:
+        """Creates histograms of movie ratings, decades and countries and
+         saves them to files named by the input_file_name.
+         Returns list of the saved files."""
+        file_paths = {
+            variant: input_file_name + ("" if variant == "rating"
+                                        else f"_{variant}") + ".png"
+            for variant in histogram_renderer.VARIANTS}
+        histogram_renderer.render_histograms(movies, file_paths)
+
+        return list(file_paths.values())
+
+    def _create_str_for_statistics(self, movies: dict) -> str:
+        """
+        Creates string with the average and median ratings,
+        and the best and worst rated movies.
+        """
+        if movies:
+            movies_statistics = movie_queries.calculate_statistics(movies)
+            best_movie = movies_statistics["best_movie"]
+            best_movie_data = {"rating": best_movie["rating"],
+                               "year": best_movie["year"]}
+            worst_movie = movies_statistics["worst_movie"]
+            worst_movie_data = {"rating": worst_movie["rating"],
+                                "year": worst_movie["year"]}
+
+            # creating output string with statistics data
+            stats_string = f"""Average rating: {movies_statistics["average_rating"]}
+Median rating: {movies_statistics["median_rating"]}
+Best movie: {best_movie["title"]} {best_movie_data}
+Worst movie: {worst_movie["title"]}, {worst_movie_data}"""
+        else:
+            stats_string = self._error_text_red_color("No movies in library")
 
-        # saving file
-        plt.savefig(input_file_name + ".png")
+        return stats_string
 
     def _sort_movies_by_rating(self, movies: dict) -> list:
         """
@@ -323,16 +359,8 @@ Worst movie: {worst_movie_name}, {worst_movie_data}"""
         This function searches for movie names in a dictionary using fuzzy matching
         and returns a list of matching movie names.
         """
-        approved_matching_score = 65
-
-        # creating list of movies that their matching score is 65+.
-        matched_movies = [
-            name for name in movies
-            if fuzz.partial_ratio(input_movie_name.lower(),
-                                  name.lower()) > approved_matching_score
-        ]
-
-        return matched_movies
+        return movie_queries.search_movie_by_fuzzy_matching(movies,
+                                                            input_movie_name)
 
     def _create_str_for_found_movies(self, found_movies_part_name: dict) -> str:
         """create a string that represent found movies and returns it"""
@@ -352,21 +380,32 @@ Worst movie: {worst_movie_name}, {worst_movie_data}"""
         It returns a dictionary containing the movies whose names
         contain part_of_name as a substring.
         """
-        part_of_name = part_of_name.lower()
-
-        # list of movies which part_of_name is part of movie name
-        found_movies_dict = {key: value for key, value in movies.items() if
-                             part_of_name in key.lower()}
-
-        return found_movies_dict
+        return movie_queries.search_movie_by_part_name(movies, part_of_name)
 
     def _user_input_press_enter_to_continue(self) -> None:
         """user input to continue with color"""
-        input(Fore.LIGHTBLUE_EX + "\nPress enter to continue" + Fore.RESET)
+        with self._waiting_for_user():
+            input(Fore.LIGHTBLUE_EX + "\nPress enter to continue" + Fore.RESET)
 
     def _user_input_text(self, text: str) -> str:
         """Asking user for an input in color, returns string"""
-        return input(Fore.BLUE + text + Fore.RESET)
+        with self._waiting_for_user():
+            return input(Fore.BLUE + text + Fore.RESET)
+
+    @contextlib.contextmanager
+    def _waiting_for_user(self):
+        """
+        excludes time of waiting for the user from the command duration
+        and from the command profile
+        """
+        pause_context = self._profiler.paused() if self._profiler \
+            else contextlib.nullcontext()
+        start_time = time.perf_counter()
+        try:
+            with pause_context:
+                yield
+        finally:
+            self._input_duration += time.perf_counter() - start_time
 
     def _error_text_red_color(self, text: str) -> str:
         """Returns colored string for an error message"""
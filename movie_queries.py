@@ -0,0 +1,63 @@
+"""
+Queries over the movies dict loaded from the storage: search and
+statistics. They are shared by the command line MovieApp and the
+HTTP MovieServer.
+"""
+import statistics
+from fuzzywuzzy import fuzz
+
+APPROVED_MATCHING_SCORE = 65
+
+
+def search_movie_by_part_name(movies: dict, part_of_name: str) -> dict:
+    """
+    searches for movies whose names contain a given string as a substring.
+    It returns a dictionary containing the movies whose names
+    contain part_of_name as a substring.
+    """
+    part_of_name = part_of_name.lower()
+
+    # list of movies which part_of_name is part of movie name
+    found_movies_dict = {key: value for key, value in movies.items() if
+                         part_of_name in key.lower()}
+
+    return found_movies_dict
+
+
+def search_movie_by_fuzzy_matching(movies: dict, input_movie_name: str) -> list:
+    """
+    This function searches for movie names in a dictionary using fuzzy matching
+    and returns a list of matching movie names.
+    """
+    input_movie_name = input_movie_name.lower()
+
+    # creating list of movies that their matching score is 65+.
+    matched_movies = [
+        name for name in movies
+        if fuzz.partial_ratio(input_movie_name,
+                              name.lower()) > APPROVED_MATCHING_SCORE
+    ]
+
+    return matched_movies
+
+
+def calculate_statistics(movies: dict) -> dict:
+    """
+    Returns the average and median ratings, and the names, ratings and years
+    of the best and worst rated movies. movies must not be empty.
+    """
+    average_rating = round(
+        sum(data["rating"] for data in movies.values()) / len(movies), 1)
+    median_rating = round(
+        statistics.median(data["rating"] for data in movies.values()), 1)
+    best_movie_name = max(movies, key=lambda movie: movies[movie]["rating"])
+    worst_movie_name = min(movies, key=lambda movie: movies[movie]["rating"])
+
+    return {"average_rating": average_rating,
+            "median_rating": median_rating,
+            "best_movie": {"title": best_movie_name,
+                           "rating": movies[best_movie_name]["rating"],
+                           "year": movies[best_movie_name]["year"]},
+            "worst_movie": {"title": worst_movie_name,
+                            "rating": movies[worst_movie_name]["rating"],
+                            "year": movies[worst_movie_name]["year"]}}
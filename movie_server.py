@@ -0,0 +1,306 @@
+"""
+HTTP API for the movies library, served with asyncio. The library is
+loaded from the storage once and kept in memory; reads are answered from
+memory and every change is written to the storage by a single writer task,
+in the order the requests arrived. Blocking work (OMDb requests, storage
+writes and website generation) runs in a thread pool, so it doesn't block
+the event loop. Website builds run one at a time, because they share
+the generated files and their cache.
+
+Endpoints:
+    GET    /movies              all movies
+    GET    /movies/<title>      one movie
+    GET    /search?q=<name>     movies by part of name, or fuzzy suggestions
+    GET    /stats               ratings statistics
+    POST   /movies              add movie from OMDb, body {"title": ...}
+    DELETE /movies/<title>      delete movie
+    PATCH  /movies/<title>      update movie note, body {"note": ...}
+    POST   /website             generate website, optional {"page_size": ...}
+"""
+import asyncio
+import http
+import json
+import urllib.parse
+import metrics
+import movie_queries
+import omdbapi_api_handler
+import web_generator
+from istorage import IStorage, create_movie_record
+
+HOST = "127.0.0.1"
+PORT = 8000
+
+
+class HttpError(Exception):
+    """Error that is sent to the client as JSON response with status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def check_movie_exists(movies: dict, title: str) -> None:
+    """raises 404 if there is no movie with title in movies"""
+    if title not in movies:
+        raise HttpError(404, f"Movie {title} doesn't exist!")
+
+
+class MovieServer:
+    """
+    Serves the movies of the storage as JSON API. The movies are loaded
+    on start and changed only through the mutations queue.
+    """
+    def __init__(self, storage: IStorage,
+                 page_size: int = web_generator.PAGE_SIZE):
+        self._storage = storage
+        # page size of the website when the request doesn't set it
+        self._page_size = page_size
+        self._movies = {}
+        self._mutations = None
+        self._writer_task = None
+        self._website_lock = None
+        self._routes = {
+            ("GET", "movies"): self._list_movies,
+            ("GET", "search"): self._search_movies,
+            ("GET", "stats"): self._movies_statistics,
+            ("POST", "movies"): self._add_movie,
+            ("DELETE", "movies"): self._delete_movie,
+            ("PATCH", "movies"): self._update_movie,
+            ("POST", "website"): self._generate_website}
+
+    async def start(self, host: str = HOST, port: int = PORT):
+        """loads the movies and starts serving, returns asyncio server"""
+        loop = asyncio.get_running_loop()
+        self._movies = await loop.run_in_executor(None,
+                                                  self._storage.load_data)
+        self._mutations = asyncio.Queue()
+        self._website_lock = asyncio.Lock()
+        self._writer_task = asyncio.create_task(self._apply_mutations())
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def stop(self, server) -> None:
+        """stops serving and waits for the queued mutations to be saved"""
+        server.close()
+        await server.wait_closed()
+        await self._mutations.join()
+        self._writer_task.cancel()
+
+    def run(self, host: str = HOST, port: int = PORT) -> None:
+        """serves until interrupted with ctrl+c"""
+        async def serve():
+            server = await self.start(host, port)
+            print(f"Serving movies on http://{host}:{port}")
+            try:
+                await server.serve_forever()
+            finally:
+                await self.stop(server)
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            print("BYE!")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        """reads HTTP requests of the connection and answers them"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                headers = {}
+                while True:
+                    header_line = await reader.readline()
+                    if header_line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header_line.decode("latin-1") \
+                        .partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = \
+                        request_line.decode("latin-1").split()
+                    body = await reader.readexactly(
+                        int(headers.get("content-length", 0)))
+                except ValueError:
+                    await self._send_response(
+                        writer, 400, {"error": "Bad request"}, False)
+                    break
+
+                keep_alive = version == "HTTP/1.1" \
+                    and headers.get("connection", "").lower() != "close"
+                status, payload = await self._dispatch(method, target, body)
+                await self._send_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send_response(self, writer: asyncio.StreamWriter, status: int,
+                             payload, keep_alive: bool) -> None:
+        """writes JSON response"""
+        body = json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                f"\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> tuple:
+        """calls handler of the route, returns (status, payload)"""
+        url = urllib.parse.urlsplit(target)
+        path = [urllib.parse.unquote(part)
+                for part in url.path.strip("/").split("/")]
+        handler = self._routes.get((method, path[0]))
+        if handler is None or len(path) > 2:
+            return 404, {"error": f"Unknown endpoint {method} {url.path}"}
+
+        with metrics.timer("http_request_duration_seconds", method=method,
+                           endpoint=path[0]):
+            try:
+                request = {"title": path[1] if len(path) > 1 else None,
+                           "query": urllib.parse.parse_qs(url.query),
+                           "body": json.loads(body) if body else {}}
+                if not isinstance(request["body"], dict):
+                    raise HttpError(400, "Body must be JSON object")
+                return await handler(request)
+            except json.JSONDecodeError:
+                return 400, {"error": "Body is not valid JSON"}
+            except HttpError as error:
+                return error.status, {"error": error.message}
+            except Exception as error:
+                return 500, {"error": f"{type(error).__name__}: {error}"}
+
+    async def _list_movies(self, request: dict) -> tuple:
+        """returns all the movies, or one movie if title is in the path"""
+        if request["title"] is None:
+            return 200, self._movies
+        title = self._existing_title(request)
+        return 200, {title: self._movies[title]}
+
+    async def _search_movies(self, request: dict) -> tuple:
+        """returns movies containing q in their name, or fuzzy matches"""
+        query = request["query"].get("q", [""])[0]
+        if not query:
+            raise HttpError(400, "Missing q parameter")
+
+        found_movies = movie_queries.search_movie_by_part_name(self._movies,
+                                                               query)
+        if found_movies:
+            return 200, {"movies": found_movies, "suggestions": []}
+        # fuzzy matching of a big library is slow, so it runs in the executor
+        loop = asyncio.get_running_loop()
+        suggestions = await loop.run_in_executor(
+            None, movie_queries.search_movie_by_fuzzy_matching, self._movies,
+            query)
+        return 200, {"movies": {}, "suggestions": suggestions}
+
+    async def _movies_statistics(self, request: dict) -> tuple:
+        """returns statistics of the movies ratings"""
+        if not self._movies:
+            raise HttpError(404, "No movies in library")
+        return 200, movie_queries.calculate_statistics(self._movies)
+
+    async def _add_movie(self, request: dict) -> tuple:
+        """searches movie in OMDb and adds it to the library"""
+        title = request["body"].get("title")
+        if request["title"] or not title:
+            raise HttpError(400, "Body must contain movie title")
+
+        loop = asyncio.get_running_loop()
+        search_result = await loop.run_in_executor(
+            None, omdbapi_api_handler.search_by_title, title)
+        if search_result["Response"] != "True":
+            raise HttpError(404, search_result["Error"])
+
+        title = search_result["Title"]
+        movie_record = create_movie_record(search_result)
+        await self._mutate(
+            lambda movies: movies.update({title: movie_record}),
+            self._storage.add_movie, search_result)
+        return 201, {title: self._movies[title]}
+
+    async def _delete_movie(self, request: dict) -> tuple:
+        """deletes movie from the library"""
+        title = self._existing_title(request)
+
+        def delete_movie(movies: dict) -> None:
+            # the movie may be deleted by a change queued before this one
+            check_movie_exists(movies, title)
+            del movies[title]
+
+        await self._mutate(delete_movie, self._storage.delete_movie, title)
+        return 200, {"deleted": title}
+
+    async def _update_movie(self, request: dict) -> tuple:
+        """updates note of the movie"""
+        title = self._existing_title(request)
+        note = request["body"].get("note")
+        if not isinstance(note, str):
+            raise HttpError(400, "Body must contain movie note")
+
+        def update_movie(movies: dict) -> None:
+            check_movie_exists(movies, title)
+            # the record is replaced, so readers of the old movies don't see it
+            movies[title] = {**movies[title], "note": note}
+
+        await self._mutate(update_movie, self._storage.update_movie, title,
+                           note)
+        return 200, {title: self._movies[title]}
+
+    async def _generate_website(self, request: dict) -> tuple:
+        """generates website from the current movies"""
+        page_size = request["body"].get("page_size", self._page_size)
+        if not isinstance(page_size, int) or page_size < 1:
+            raise HttpError(400, "page_size must be a positive number")
+
+        loop = asyncio.get_running_loop()
+        async with self._website_lock:
+            movies = dict(self._movies)
+            await loop.run_in_executor(None, web_generator.generate_web,
+                                       movies, page_size)
+        return 200, {"generated": len(movies)}
+
+    def _existing_title(self, request: dict) -> str:
+        """returns title from the path, raises 404 if there is no movie"""
+        title = request["title"]
+        check_movie_exists(self._movies, title)
+        return title
+
+    async def _mutate(self, change, method, *args) -> None:
+        """
+        Queues change of the storage and waits until it's saved.
+        change is called with copy of the movies to apply it in memory,
+        it raises HttpError if the change is not valid anymore. Then method
+        of the storage is called with args to save the change.
+        """
+        done = asyncio.get_running_loop().create_future()
+        await self._mutations.put((change, method, args, done))
+        await done
+
+    async def _apply_mutations(self) -> None:
+        """
+        The only writer of the storage: saves the queued changes one by one.
+        Every change is applied to a copy of the movies, that replaces them
+        after the change is saved, so readers of the previous movies are
+        not affected.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            change, method, args, done = await self._mutations.get()
+            try:
+                movies = dict(self._movies)
+                change(movies)
+                await loop.run_in_executor(None, method, *args)
+                self._movies = movies
+                done.set_result(None)
+            except Exception as error:
+                done.set_exception(error)
+            finally:
+                self._mutations.task_done()
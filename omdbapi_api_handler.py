@@ -1,8 +1,10 @@
 import requests
+import metrics
 
 API_KEY = "f994fda"
 
 
+@metrics.timed("omdb_request_duration_seconds")
 def search_by_title(title: str) -> dict:
     """Search request for movie title. Returns dict with data of found movie"""
     url = f"https://www.omdbapi.com/?apikey={API_KEY}&t={title}"
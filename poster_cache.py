@@ -0,0 +1,121 @@
+"""
+Downloads movie posters to _static/posters, so the generated website
+doesn't depend on the remote host. Posters are stored by the hash of their
+content, together with a small thumbnail that is used on the website.
+Thumbnails are created with Pillow if it's installed, otherwise the
+website uses the full size poster.
+"""
+import concurrent.futures
+import hashlib
+import io
+import json
+import os
+import requests
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+POSTERS_DIR = os.path.join("_static", "posters")
+POSTERS_INDEX_PATH = os.path.join(POSTERS_DIR, "index.json")
+# posters are referenced from the pages in _static
+POSTERS_URL_PATH = "posters/"
+THUMBNAIL_SIZE = (128, 193)
+MAX_DOWNLOADS = 8
+DOWNLOAD_TIMEOUT = 10
+
+
+def prefetch_posters(movies: dict, max_downloads: int = MAX_DOWNLOADS) -> dict:
+    """
+    Downloads posters of the movies that are not cached yet, at most
+    max_downloads at the same time. Returns copy of movies, with "image"
+    of every cached poster pointing to its local thumbnail.
+    """
+    posters_index = load_posters_index()
+    poster_urls = {data["image"] for data in movies.values()
+                   if data["image"].startswith("http")}
+    missing_urls = poster_urls - posters_index.keys()
+
+    if missing_urls:
+        with concurrent.futures.ThreadPoolExecutor(max_downloads) as executor:
+            for url, poster in zip(missing_urls,
+                                   executor.map(download_poster, missing_urls)):
+                if poster:
+                    posters_index[url] = poster
+        save_posters_index(posters_index)
+
+    return {movie: {**data, "image": POSTERS_URL_PATH
+                    + posters_index[data["image"]]["thumbnail"]}
+            if data["image"] in posters_index else data
+            for movie, data in movies.items()}
+
+
+def load_posters_index() -> dict:
+    """returns dict of poster url to names of its local poster and thumbnail"""
+    try:
+        with open(POSTERS_INDEX_PATH, "r") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_posters_index(posters_index: dict) -> None:
+    """saves posters index"""
+    os.makedirs(POSTERS_DIR, exist_ok=True)
+    with open(POSTERS_INDEX_PATH, "w") as file:
+        json.dump(posters_index, file)
+
+
+def download_poster(url: str) -> dict:
+    """
+    Downloads poster and saves it with its thumbnail in posters folder.
+    Returns dict with file names of the poster and the thumbnail,
+    None if poster couldn't be downloaded.
+    """
+    try:
+        with requests.get(url, timeout=DOWNLOAD_TIMEOUT) as res:
+            if not res.ok:
+                return None
+            poster = res.content
+    except requests.exceptions.RequestException:
+        return None
+
+    content_hash = hashlib.sha256(poster).hexdigest()
+    extension = os.path.splitext(url)[1].lower() or ".jpg"
+    poster_name = content_hash + extension
+    _save_if_missing(poster_name, poster)
+
+    thumbnail = create_thumbnail(poster)
+    if thumbnail is None:
+        return {"poster": poster_name, "thumbnail": poster_name}
+
+    thumbnail_name = f"{content_hash}_thumb.jpg"
+    _save_if_missing(thumbnail_name, thumbnail)
+    return {"poster": poster_name, "thumbnail": thumbnail_name}
+
+
+def create_thumbnail(poster: bytes) -> bytes:
+    """returns poster resized to THUMBNAIL_SIZE as jpg, None without Pillow"""
+    if Image is None:
+        return None
+
+    try:
+        with Image.open(io.BytesIO(poster)) as image:
+            image = image.convert("RGB")
+            image.thumbnail(THUMBNAIL_SIZE)
+            thumbnail = io.BytesIO()
+            image.save(thumbnail, "JPEG", quality=85)
+    except OSError:
+        return None
+    return thumbnail.getvalue()
+
+
+def _save_if_missing(file_name: str, content: bytes) -> None:
+    """saves content in posters folder, unless the file already exists"""
+    file_path = os.path.join(POSTERS_DIR, file_name)
+    if os.path.exists(file_path):
+        return
+    os.makedirs(POSTERS_DIR, exist_ok=True)
+    with open(file_path, "wb") as file:
+        file.write(content)
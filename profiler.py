@@ -0,0 +1,134 @@
+"""
+Profiling of the MovieApp commands. Every executed command is profiled
+with cProfile, and its stats are added to <command>.prof in the output
+folder. summary.txt lists the hottest functions of every command.
+With the sampling mode commands are profiled with pyinstrument, if it's
+installed, and every execution is saved as a text report.
+Only the calling process is profiled: with workers > 1 the website
+cards are rendered in child processes that don't appear in the profiles.
+"""
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+PROFILE_DIR = "profiles"
+TOP_FUNCTIONS = 20
+
+
+class CommandProfiler:
+    """
+    Profiles commands and saves profiles to output_dir. top_n is number
+    of the hottest functions of every command in the summary.
+    """
+    def __init__(self, output_dir: str = PROFILE_DIR,
+                 top_n: int = TOP_FUNCTIONS, sampling: bool = False):
+        self._output_dir = output_dir
+        self._top_n = top_n
+        self._sampling = sampling and pyinstrument is not None
+        self._command_stats = {}
+        self._sampling_reports = {}
+        # profiler of the command that runs now, None between commands
+        self._active_profiler = None
+        os.makedirs(output_dir, exist_ok=True)
+
+    @property
+    def sampling(self) -> bool:
+        return self._sampling
+
+    @contextlib.contextmanager
+    def profile(self, command_name: str):
+        """context manager that profiles the code as command_name"""
+        if self._sampling:
+            with self._profile_sampling(command_name):
+                yield
+            return
+
+        profile = cProfile.Profile()
+        self._active_profiler = profile
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._active_profiler = None
+            self._add_stats(command_name, profile)
+
+    @contextlib.contextmanager
+    def paused(self):
+        """
+        context manager that stops profiling the current command, used
+        while the command waits for the user input
+        """
+        active_profiler = self._active_profiler
+        if active_profiler is None:
+            yield
+            return
+
+        if self._sampling:
+            active_profiler.stop()
+        else:
+            active_profiler.disable()
+        try:
+            yield
+        finally:
+            if self._sampling:
+                active_profiler.start()
+            else:
+                active_profiler.enable()
+
+    @contextlib.contextmanager
+    def _profile_sampling(self, command_name: str):
+        """profiles with pyinstrument and saves text report of the run"""
+        sampling_profiler = pyinstrument.Profiler()
+        self._active_profiler = sampling_profiler
+        sampling_profiler.start()
+        try:
+            yield
+        finally:
+            sampling_profiler.stop()
+            self._active_profiler = None
+            run_number = self._sampling_reports.get(command_name, 0) + 1
+            self._sampling_reports[command_name] = run_number
+            report_path = os.path.join(self._output_dir,
+                                       f"{command_name}_{run_number}.txt")
+            with open(report_path, "w") as file:
+                file.write(sampling_profiler.output_text())
+
+    def _add_stats(self, command_name: str, profile: cProfile.Profile) -> None:
+        """adds profile to stats of the command and saves them"""
+        if command_name in self._command_stats:
+            self._command_stats[command_name].add(profile)
+        else:
+            self._command_stats[command_name] = pstats.Stats(profile)
+        self._command_stats[command_name].dump_stats(
+            os.path.join(self._output_dir, f"{command_name}.prof"))
+
+    def create_summary(self) -> str:
+        """
+        returns the top_n hottest functions of every profiled command,
+        sorted by time spent in the function itself
+        """
+        summary = io.StringIO()
+        summary.write("Time waiting for the user input is not profiled. "
+                      "With workers > 1 website cards are rendered in child "
+                      "processes, which are not profiled.\n")
+        for command_name, stats in self._command_stats.items():
+            summary.write(f"{'=' * 20} {command_name} {'=' * 20}\n")
+            stats.stream = summary
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(self._top_n)
+        for command_name, runs in self._sampling_reports.items():
+            summary.write(f"{command_name}: {runs} sampling reports\n")
+
+        return summary.getvalue()
+
+    def save_summary(self) -> None:
+        """saves summary of the profiled commands to summary.txt"""
+        with open(os.path.join(self._output_dir, "summary.txt"), "w") as file:
+            file.write(self.create_summary())
@@ -0,0 +1,115 @@
+"""
+Watch mode: regenerates the website when the storage file changes.
+The file is watched by polling its stat, which is cheap and works for
+changes made by any process. A burst of writes is debounced into one
+rebuild, and the website is regenerated only if some movies really
+changed since the previous snapshot. The diff only decides whether to
+rebuild: generate_web itself finds the pages of the changed movies by
+their page keys and skips the rest.
+"""
+import os
+import time
+import web_generator
+from istorage import IStorage
+
+POLL_INTERVAL = 0.5
+DEBOUNCE_DELAY = 1.0
+
+
+def create_snapshot(movies: dict) -> dict:
+    """
+    returns dict of movie title to the movie record. Records are compared
+    directly, that is cheaper than hashing them
+    """
+    return dict(movies)
+
+
+def diff_snapshots(old_snapshot: dict, new_snapshot: dict) -> dict:
+    """returns titles of added, changed and removed movies"""
+    return {"added": [movie for movie in new_snapshot
+                      if movie not in old_snapshot],
+            "changed": [movie for movie, data in new_snapshot.items()
+                        if movie in old_snapshot
+                        and old_snapshot[movie] != data],
+            "removed": [movie for movie in old_snapshot
+                        if movie not in new_snapshot]}
+
+
+class SiteWatcher:
+    """
+    Watches the storage file and regenerates the website after it changes.
+    The website is generated when the file didn't change for
+    debounce_delay seconds, so many quick writes cause one rebuild.
+    """
+    def __init__(self, storage: IStorage, poll_interval: float = POLL_INTERVAL,
+                 debounce_delay: float = DEBOUNCE_DELAY, **generate_options):
+        self._storage = storage
+        self._poll_interval = poll_interval
+        self._debounce_delay = debounce_delay
+        # options passed to web_generator.generate_web
+        self._generate_options = generate_options
+        # None until the first rebuild, that always generates the website
+        self._snapshot = None
+        self._file_signature = None
+
+    def run(self) -> None:
+        """builds the website and rebuilds it on changes, until ctrl+c"""
+        print(f"Watching {self._storage.file_path}, press ctrl+c to stop")
+        self._file_signature = self._get_file_signature()
+        self._try_rebuild()
+        try:
+            while True:
+                time.sleep(self._poll_interval)
+                if self._get_file_signature() != self._file_signature:
+                    self._wait_until_file_settles()
+                    self._try_rebuild()
+        except KeyboardInterrupt:
+            print("BYE!")
+
+    def rebuild(self) -> dict:
+        """
+        Loads the movies and regenerates the website on the first call, and
+        later if they changed since the last rebuild. Returns diff of the
+        movies.
+        """
+        movies = self._storage.load_data()
+        new_snapshot = create_snapshot(movies)
+        movies_diff = diff_snapshots(self._snapshot or {}, new_snapshot)
+
+        if self._snapshot is None or any(movies_diff.values()):
+            web_generator.generate_web(movies, **self._generate_options)
+            print(f"Website regenerated: {len(movies_diff['added'])} added, "
+                  f"{len(movies_diff['changed'])} changed, "
+                  f"{len(movies_diff['removed'])} removed")
+        self._snapshot = new_snapshot
+
+        return movies_diff
+
+    def _try_rebuild(self) -> None:
+        """
+        rebuilds website, prints error if the file can't be loaded, for
+        example while it's half-written or replaced by another process
+        """
+        try:
+            self.rebuild()
+        except (ValueError, SyntaxError, OSError) as error:
+            print(f"Couldn't load movies, waiting for next change: {error}")
+
+    def _wait_until_file_settles(self) -> None:
+        """waits until the file didn't change for debounce delay"""
+        last_change_time = time.monotonic()
+        self._file_signature = self._get_file_signature()
+        while time.monotonic() - last_change_time < self._debounce_delay:
+            time.sleep(self._poll_interval)
+            file_signature = self._get_file_signature()
+            if file_signature != self._file_signature:
+                self._file_signature = file_signature
+                last_change_time = time.monotonic()
+
+    def _get_file_signature(self) -> tuple:
+        """returns modification time, size and inode of the storage file"""
+        try:
+            file_stat = os.stat(self._storage.file_path)
+        except FileNotFoundError:
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino
@@ -1,4 +1,4 @@
-from istorage import IStorage
+from istorage import IStorage, create_movie_record
 import json
 import os
 
@@ -58,16 +58,11 @@ class StorageJson(IStorage):
 
     def add_movie(self, data: dict) -> None:
         """Adds a movie to the movie's database."""
-        title, imdb_id = data["Title"], data["imdbID"]
-        year, image_url = int(data["Year"]), data["Poster"]
-        rating, country = float(data["imdbRating"]), data["Country"]
-
         # loading data
         movies: dict = self.load_data()
 
         # updating data
-        movies[title] = {"rating": rating, "year": year, "image": image_url,
-                         "imdb_id": imdb_id, "country": country}
+        movies[data["Title"]] = create_movie_record(data)
 
         self._save_data(movies)
 
@@ -0,0 +1,62 @@
+import os
+import pytest
+
+pytest.importorskip("matplotlib")
+
+import histogram_renderer
+from matplotlib import pyplot as plt
+from matplotlib.figure import Figure
+
+movies = {"12 Angry Men": {"rating": 9.0, "year": 1957,
+                           "country": "United States"},
+          "The Room": {"rating": 3.6, "year": 2003,
+                       "country": "United States"},
+          "Amelie": {"rating": 8.3, "year": 2001,
+                     "country": "France, Germany"}}
+
+
+@pytest.fixture
+def work_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_extract_charts_data():
+    charts_data = histogram_renderer.extract_charts_data(movies)
+    assert charts_data["rating"]["values"] == [3.6, 8.3, 9.0]
+    assert charts_data["decade"]["bins"] == [1950, 1960, 1970, 1980, 1990,
+                                             2000, 2010]
+    assert charts_data["country"]["counts"] == [("United States", 2),
+                                                ("France", 1)]
+
+
+def test_render_all_variants(work_dir):
+    file_paths = {variant: f"{variant}.png"
+                  for variant in histogram_renderer.VARIANTS}
+    histogram_renderer.render_histograms(movies, file_paths)
+    for file_path in file_paths.values():
+        with open(file_path, "rb") as file:
+            assert file.read(8) == b"\x89PNG\r\n\x1a\n"
+    assert plt.get_fignums() == []
+
+
+def test_cached_histogram_not_rendered_again(work_dir, monkeypatch):
+    histogram_renderer.render_histograms(movies, {"rating": "first.png"})
+    rendered = []
+    monkeypatch.setattr(Figure, "savefig",
+                        lambda figure, *args, **kwargs: rendered.append(args))
+
+    histogram_renderer.render_histograms(dict(reversed(movies.items())),
+                                         {"rating": "second.png"})
+    assert rendered == []
+    assert os.path.getsize("first.png") == os.path.getsize("second.png")
+
+
+def test_histogram_cache_bounded(work_dir, monkeypatch):
+    monkeypatch.setattr(histogram_renderer, "HISTOGRAM_CACHE_SIZE", 2)
+    for rating in range(4):
+        changed_movies = {**movies, "Heat": {"rating": rating, "year": 1995,
+                                             "country": "United States"}}
+        histogram_renderer.render_histograms(changed_movies,
+                                             {"rating": f"{rating}.png"})
+    assert len(os.listdir(histogram_renderer.HISTOGRAM_CACHE_DIR)) == 2
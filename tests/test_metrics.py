@@ -0,0 +1,89 @@
+import json
+import time
+import pytest
+import metrics
+from instrumented_storage import InstrumentedStorage
+from storage_json import StorageJson
+
+movie_to_add = {"Title": "12 Angry Men",
+                "imdbRating": 9.0,
+                "Year": 1957,
+                "Poster": "https://m.media-amazon.com/images/M/MV5BMWU4N2FjNzYtNTVkNC00NzQ0LTg0MjAtYTJlMjFhNGUxZDFmXkEyXkFqcGdeQXVyNjc1NTYyMjg@._V1_SX300.jpg",
+                "imdbID": "tt0050083",
+                "Country": "United States"}
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def test_disabled_metrics_not_collected():
+    metrics.reset()
+    with metrics.timer("command_duration_seconds", command="test"):
+        pass
+    metrics.increment("storage_records_total")
+    assert json.loads(metrics.to_json()) == {"histograms": [], "counters": []}
+
+
+def test_timer_histogram(enabled_metrics):
+    with metrics.timer("command_duration_seconds", command="test"):
+        pass
+    histogram = json.loads(metrics.to_json())["histograms"][0]
+    assert histogram["name"] == "command_duration_seconds"
+    assert histogram["labels"] == {"command": "test"}
+    assert histogram["count"] == 1
+    assert histogram["buckets"]["+Inf"] == 1
+
+
+def test_command_duration_without_user_input(enabled_metrics, tmp_path,
+                                             monkeypatch):
+    movie_app_module = pytest.importorskip("movie_app")
+    monkeypatch.setattr("builtins.input",
+                        lambda prompt: time.sleep(0.3) or "")
+    movie_app = movie_app_module.MovieApp(StorageJson(str(tmp_path / "movies")))
+    movie_app._execute_command("6")
+
+    histogram = json.loads(metrics.to_json())["histograms"][0]
+    assert histogram["labels"] == {"command": "_random_movie_command"}
+    assert histogram["count"] == 1
+    assert histogram["sum"] < 0.1
+
+
+def test_prometheus_format(enabled_metrics):
+    metrics.observe("site_build_duration_seconds", 0.3)
+    metrics.increment("storage_records_total", 5, operation="load_data")
+    exported = metrics.to_prometheus()
+    assert "# TYPE site_build_duration_seconds histogram" in exported
+    assert 'site_build_duration_seconds_bucket{le="0.25"} 0' in exported
+    assert 'site_build_duration_seconds_bucket{le="0.5"} 1' in exported
+    assert "site_build_duration_seconds_count 1" in exported
+    assert 'storage_records_total{operation="load_data"} 5' in exported
+
+
+def test_instrumented_storage(enabled_metrics, tmp_path):
+    storage = InstrumentedStorage(StorageJson(str(tmp_path / "movies")))
+    storage.add_movie(movie_to_add)
+    assert "12 Angry Men" in storage.load_data()
+
+    counters = {(counter["name"], counter["labels"]["operation"]):
+                counter["value"]
+                for counter in json.loads(metrics.to_json())["counters"]}
+    assert counters[("storage_records_total", "load_data")] == 1
+    assert counters[("storage_written_bytes_total", "add_movie")] > 0
+    assert counters[("storage_read_bytes_total", "load_data")] \
+        == counters[("storage_written_bytes_total", "add_movie")]
+
+
+def test_dump_in_thread_waits_for_lock(enabled_metrics, tmp_path):
+    metrics_path = tmp_path / "metrics.json"
+    with metrics._lock:
+        dump_thread = metrics.dump_in_thread(str(metrics_path))
+        assert not metrics_path.exists()
+    dump_thread.join()
+    assert json.loads(metrics_path.read_text()) == {"histograms": [],
+                                                    "counters": []}
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import threading
+import time
+import pytest
+
+pytest.importorskip("fuzzywuzzy")
+pytest.importorskip("requests")
+
+import omdbapi_api_handler
+import web_generator
+from movie_server import MovieServer
+from storage_json import StorageJson
+
+movie_to_add = {"Response": "True",
+                "Title": "12 Angry Men",
+                "imdbRating": 9.0,
+                "Year": 1957,
+                "Poster": "https://m.media-amazon.com/images/M/MV5BMWU4N2FjNzYtNTVkNC00NzQ0LTg0MjAtYTJlMjFhNGUxZDFmXkEyXkFqcGdeQXVyNjc1NTYyMjg@._V1_SX300.jpg",
+                "imdbID": "tt0050083",
+                "Country": "United States"}
+
+
+async def request(port: int, method: str, path: str, body=None) -> tuple:
+    """sends HTTP request to the server, returns (status, JSON payload)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    content = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\n"
+                 f"Content-Length: {len(content)}\r\nConnection: close\r\n"
+                 f"\r\n".encode() + content)
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+def run_with_server(storage, scenario):
+    """runs scenario(port) against a server of the storage"""
+    async def run():
+        movie_server = MovieServer(storage)
+        server = await movie_server.start("127.0.0.1", 0)
+        try:
+            await scenario(server.sockets[0].getsockname()[1])
+        finally:
+            await movie_server.stop(server)
+
+    asyncio.run(run())
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(omdbapi_api_handler, "search_by_title",
+                        lambda title: movie_to_add)
+    return StorageJson(str(tmp_path / "movies"))
+
+
+def test_add_update_delete_movie(storage):
+    async def scenario(port):
+        status, payload = await request(port, "POST", "/movies",
+                                        {"title": "12 angry men"})
+        assert status == 201
+        assert payload["12 Angry Men"]["rating"] == 9.0
+
+        status, payload = await request(port, "PATCH", "/movies/12%20Angry%20Men",
+                                        {"note": "test"})
+        assert status == 200
+        assert storage.load_data()["12 Angry Men"]["note"] == "test"
+
+        assert await request(port, "GET", "/movies") \
+            == (200, storage.load_data())
+
+        status, _ = await request(port, "DELETE", "/movies/12%20Angry%20Men")
+        assert status == 200
+        assert await request(port, "GET", "/movies") == (200, {})
+
+    run_with_server(storage, scenario)
+
+
+def test_search_and_stats(storage):
+    storage.add_movie(movie_to_add)
+
+    async def scenario(port):
+        status, payload = await request(port, "GET", "/search?q=angry")
+        assert status == 200 and "12 Angry Men" in payload["movies"]
+
+        status, payload = await request(port, "GET", "/search?q=angri%20man")
+        assert payload["suggestions"] == ["12 Angry Men"]
+
+        status, payload = await request(port, "GET", "/stats")
+        assert payload["best_movie"]["title"] == "12 Angry Men"
+
+    run_with_server(storage, scenario)
+
+
+def test_errors(storage):
+    async def scenario(port):
+        assert (await request(port, "GET", "/stats"))[0] == 404
+        assert (await request(port, "DELETE", "/movies/Titanic"))[0] == 404
+        assert (await request(port, "GET", "/unknown"))[0] == 404
+        assert (await request(port, "POST", "/movies", [1]))[0] == 400
+
+    run_with_server(storage, scenario)
+
+
+def test_concurrent_website_builds_serialized(storage, monkeypatch):
+    running_builds, max_running_builds = [], []
+    builds_lock = threading.Lock()
+
+    def generate_web(movies, page_size):
+        with builds_lock:
+            running_builds.append(page_size)
+            max_running_builds.append(len(running_builds))
+        time.sleep(0.05)
+        with builds_lock:
+            running_builds.remove(page_size)
+
+    monkeypatch.setattr(web_generator, "generate_web", generate_web)
+
+    async def scenario(port):
+        responses = await asyncio.gather(
+            *[request(port, "POST", "/website") for _ in range(4)])
+        assert [status for status, _ in responses] == [200] * 4
+
+    run_with_server(storage, scenario)
+    assert max_running_builds == [1] * 4
+
+
+def test_update_after_queued_delete_not_found(storage):
+    storage.add_movie(movie_to_add)
+
+    async def scenario(port):
+        responses = await asyncio.gather(
+            request(port, "DELETE", "/movies/12%20Angry%20Men"),
+            request(port, "PATCH", "/movies/12%20Angry%20Men",
+                    {"note": "test"}))
+        assert [status for status, _ in responses] == [200, 404]
+
+    run_with_server(storage, scenario)
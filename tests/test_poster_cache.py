@@ -0,0 +1,91 @@
+import http.server
+import io
+import os
+import threading
+import pytest
+
+pytest.importorskip("requests")
+
+import poster_cache
+
+POSTER = b"poster bytes"
+movies = {"12 Angry Men": {"rating": 9.0,
+                           "year": 1957,
+                           "image": "",
+                           "imdb_id": "tt0050083",
+                           "country": "United States"},
+          "The Room": {"rating": 3.6,
+                       "year": 2003,
+                       "image": "N/A",
+                       "imdb_id": "tt0368226",
+                       "country": "United States"}}
+
+
+class PosterHandler(http.server.BaseHTTPRequestHandler):
+    """serves POSTER for /poster.jpg, 404 for anything else"""
+    requested_paths = []
+
+    def do_GET(self):
+        PosterHandler.requested_paths.append(self.path)
+        if self.path == "/poster.jpg":
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(POSTER)))
+            self.end_headers()
+            self.wfile.write(POSTER)
+        else:
+            self.send_error(404)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def poster_server(tmp_path, monkeypatch):
+    """runs local http server with posters, returns its url"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(poster_cache, "Image", None)
+    PosterHandler.requested_paths = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), PosterHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_posters_downloaded_and_rewritten(poster_server):
+    library = {**movies, "12 Angry Men": {**movies["12 Angry Men"],
+                                          "image": poster_server + "/poster.jpg"}}
+    local_movies = poster_cache.prefetch_posters(library)
+
+    local_image = local_movies["12 Angry Men"]["image"]
+    assert local_image.startswith(poster_cache.POSTERS_URL_PATH)
+    with open(os.path.join("_static", local_image), "rb") as file:
+        assert file.read() == POSTER
+    assert local_movies["The Room"]["image"] == "N/A"
+
+
+def test_cached_posters_not_downloaded_again(poster_server):
+    library = {"12 Angry Men": {**movies["12 Angry Men"],
+                                "image": poster_server + "/poster.jpg"}}
+    poster_cache.prefetch_posters(library)
+    poster_cache.prefetch_posters(library)
+    assert PosterHandler.requested_paths == ["/poster.jpg"]
+
+
+def test_missing_poster_keeps_remote_url(poster_server):
+    library = {"12 Angry Men": {**movies["12 Angry Men"],
+                                "image": poster_server + "/missing.jpg"}}
+    local_movies = poster_cache.prefetch_posters(library)
+    assert local_movies == library
+
+
+def test_thumbnail_created_with_pillow():
+    image_module = pytest.importorskip("PIL.Image")
+    poster = image_module.new("RGB", (300, 444))
+    poster_bytes = io.BytesIO()
+    poster.save(poster_bytes, "JPEG")
+
+    thumbnail = poster_cache.create_thumbnail(poster_bytes.getvalue())
+    with image_module.open(io.BytesIO(thumbnail)) as image:
+        assert image.size[0] <= poster_cache.THUMBNAIL_SIZE[0]
+        assert image.size[1] <= poster_cache.THUMBNAIL_SIZE[1]
@@ -0,0 +1,43 @@
+import os
+import pstats
+import pytest
+from profiler import CommandProfiler
+
+
+def slow_function():
+    return sum(range(10000))
+
+
+def test_command_profile_saved(tmp_path):
+    profiler = CommandProfiler(str(tmp_path), top_n=5)
+    for _ in range(2):
+        with profiler.profile("_statistics_command"):
+            slow_function()
+
+    stats = pstats.Stats(str(tmp_path / "_statistics_command.prof"))
+    slow_function_calls = [call_stats[0] for function, call_stats in
+                           stats.stats.items() if function[2] == "slow_function"]
+    assert slow_function_calls == [2]
+
+
+def test_profile_saved_on_exit(tmp_path):
+    profiler = CommandProfiler(str(tmp_path))
+    with pytest.raises(SystemExit):
+        with profiler.profile("_exit_program"):
+            slow_function()
+            raise SystemExit
+
+    profiler.save_summary()
+    assert os.path.exists(tmp_path / "_exit_program.prof")
+    assert "slow_function" in (tmp_path / "summary.txt").read_text()
+
+
+def test_paused_code_not_profiled(tmp_path):
+    profiler = CommandProfiler(str(tmp_path))
+    with profiler.profile("_statistics_command"):
+        with profiler.paused():
+            slow_function()
+
+    stats = pstats.Stats(str(tmp_path / "_statistics_command.prof"))
+    assert not [function for function in stats.stats
+                if function[2] == "slow_function"]
@@ -0,0 +1,58 @@
+import os
+import pytest
+
+pytest.importorskip("pycountry")
+pytest.importorskip("requests")
+
+import web_generator
+from site_watcher import SiteWatcher, create_snapshot, diff_snapshots
+from storage_json import StorageJson
+
+movie_to_add = {"Title": "12 Angry Men",
+                "imdbRating": 9.0,
+                "Year": 1957,
+                "Poster": "https://m.media-amazon.com/images/M/MV5BMWU4N2FjNzYtNTVkNC00NzQ0LTg0MjAtYTJlMjFhNGUxZDFmXkEyXkFqcGdeQXVyNjc1NTYyMjg@._V1_SX300.jpg",
+                "imdbID": "tt0050083",
+                "Country": "United States"}
+
+
+def test_diff_snapshots():
+    old_snapshot = create_snapshot({"Titanic": {"rating": 7.9},
+                                    "Avatar": {"rating": 7.9}})
+    new_snapshot = create_snapshot({"Titanic": {"rating": 8.0},
+                                    "Heat": {"rating": 8.3}})
+    assert diff_snapshots(old_snapshot, new_snapshot) == {
+        "added": ["Heat"], "changed": ["Titanic"], "removed": ["Avatar"]}
+
+
+def test_rebuild_only_when_movies_changed(tmp_path, monkeypatch):
+    generated = []
+    monkeypatch.setattr(web_generator, "generate_web",
+                        lambda movies, **options: generated.append(movies))
+    storage = StorageJson(str(tmp_path / "movies"))
+    storage.add_movie(movie_to_add)
+    watcher = SiteWatcher(storage)
+
+    assert watcher.rebuild()["added"] == ["12 Angry Men"]
+    storage.add_movie(movie_to_add)
+    assert not any(watcher.rebuild().values())
+    storage.update_movie("12 Angry Men", "test")
+    assert watcher.rebuild()["changed"] == ["12 Angry Men"]
+    assert len(generated) == 2
+
+
+def test_empty_library_built_on_start(tmp_path, monkeypatch):
+    generated = []
+    monkeypatch.setattr(web_generator, "generate_web",
+                        lambda movies, **options: generated.append(movies))
+    watcher = SiteWatcher(StorageJson(str(tmp_path / "movies")))
+    watcher.rebuild()
+    watcher.rebuild()
+    assert generated == [{}]
+
+
+def test_missing_file_waits_for_next_change(tmp_path, capsys):
+    storage = StorageJson(str(tmp_path / "movies"))
+    os.remove(storage.file_path)
+    SiteWatcher(storage)._try_rebuild()
+    assert "waiting for next change" in capsys.readouterr().out
@@ -0,0 +1,198 @@
+import os
+import shutil
+import threading
+import tracemalloc
+import pytest
+
+pytest.importorskip("pycountry")
+pytest.importorskip("requests")
+
+import flags_api_handler
+import web_generator
+
+movies = {"12 Angry Men": {"rating": 9.0,
+                           "year": 1957,
+                           "image": "https://m.media-amazon.com/images/M/MV5BMWU4N2FjNzYtNTVkNC00NzQ0LTg0MjAtYTJlMjFhNGUxZDFmXkEyXkFqcGdeQXVyNjc1NTYyMjg@._V1_SX300.jpg",
+                           "imdb_id": "tt0050083",
+                           "country": "United States"}}
+
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    """runs the test inside a temporary copy of the _static folder"""
+    static_path = tmp_path / "_static"
+    static_path.mkdir()
+    with open(web_generator.TEMPLATE_PATH, "r") as file:
+        (static_path / "index_template.html").write_text(file.read())
+    (static_path / "flags").mkdir()
+    (static_path / "flags" / "US.png").write_bytes(b"png")
+    monkeypatch.chdir(tmp_path)
+    return static_path
+
+
+def test_flag_rendered_by_css_class(static_dir):
+    movie_html = web_generator.generate_movie("12 Angry Men",
+                                              movies["12 Angry Men"])
+    assert "<span class='country_flag flag-us'></span>" in movie_html
+    assert "countryflagicons" not in movie_html
+
+
+def test_flags_sprite_created(static_dir):
+    web_generator.generate_web(movies)
+    sprite = (static_dir / "flags.css").read_text()
+    assert ".flag-us" in sprite
+    assert "data:image/png;base64,cG5n" in sprite
+
+
+def test_flags_sprite_not_rewritten_when_unchanged(static_dir):
+    web_generator.generate_web(movies)
+    os.utime(flags_api_handler.FLAGS_SPRITE_PATH, (0, 0))
+    web_generator.generate_web(movies)
+    assert os.path.getmtime(flags_api_handler.FLAGS_SPRITE_PATH) == 0
+
+
+def test_failed_flag_download_not_retried(static_dir, monkeypatch):
+    requested = []
+
+    def failing_get(url, timeout):
+        requested.append(url)
+        raise flags_api_handler.requests.exceptions.Timeout()
+
+    monkeypatch.setattr(flags_api_handler.requests, "get", failing_get)
+    monkeypatch.setattr(flags_api_handler, "_failed_flag_codes", set())
+    flags_api_handler.build_flags_sprite(["FR", "US"])
+    flags_api_handler.build_flags_sprite(["FR", "US"])
+    assert requested == [flags_api_handler.FLAG_URL.format("FR")]
+    assert ".flag-us" in (static_dir / "flags.css").read_text()
+
+
+def test_missing_flags_downloaded_concurrently(static_dir, monkeypatch):
+    barrier = threading.Barrier(3, timeout=5)
+
+    class FlagResponse:
+        content = b"flag"
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            pass
+
+        def raise_for_status(self):
+            pass
+
+    def waiting_get(url, timeout):
+        barrier.wait()
+        return FlagResponse()
+
+    monkeypatch.setattr(flags_api_handler.requests, "get", waiting_get)
+    flags_api_handler.build_flags_sprite(["DE", "FR", "IT"])
+    assert ".flag-it" in (static_dir / "flags.css").read_text()
+
+
+def test_unchanged_movies_taken_from_cache(static_dir, monkeypatch):
+    web_generator.generate_web(movies)
+    rendered = []
+    generate_movie = web_generator.generate_movie
+    monkeypatch.setattr(web_generator, "generate_movie",
+                        lambda title, data: rendered.append(title)
+                        or generate_movie(title, data))
+
+    changed_movies = {**movies, "Titanic": {**movies["12 Angry Men"],
+                                            "imdb_id": "tt0120338"}}
+    web_generator.generate_web(changed_movies)
+    assert rendered == ["Titanic"]
+    assert "Titanic" in (static_dir / "index.html").read_text()
+
+    changed_movies["Titanic"] = {**changed_movies["Titanic"], "note": "new"}
+    web_generator.generate_web(changed_movies)
+    assert rendered == ["Titanic", "Titanic"]
+
+
+def test_unchanged_pages_skipped_without_io(static_dir, monkeypatch):
+    two_movies = {**movies, "Titanic": {**movies["12 Angry Men"],
+                                        "imdb_id": "tt0120338"}}
+    web_generator.generate_web(two_movies, page_size=1)
+    opened = []
+    monkeypatch.setattr(web_generator, "open", lambda path, *args, **kwargs:
+                        opened.append(path) or open(path, *args, **kwargs),
+                        raising=False)
+
+    two_movies["Titanic"] = {**two_movies["Titanic"], "note": "new"}
+    web_generator.generate_web(two_movies, page_size=1)
+    assert web_generator.NEW_WEB_PATH + ".tmp" not in opened
+    assert web_generator.FRAGMENTS_CACHE_PATH.format(1) not in opened
+    assert web_generator.PAGE_PATH.format(2) + ".tmp" in opened
+
+
+def test_unchanged_page_not_rewritten(static_dir):
+    web_generator.generate_web(movies)
+    os.utime(web_generator.NEW_WEB_PATH, (0, 0))
+    web_generator.generate_web(movies)
+    assert os.path.getmtime(web_generator.NEW_WEB_PATH) == 0
+
+    web_generator.generate_web({})
+    assert os.path.getmtime(web_generator.NEW_WEB_PATH) != 0
+
+
+def test_pages_and_data_shards(static_dir):
+    two_movies = {**movies, "Titanic": {**movies["12 Angry Men"],
+                                        "imdb_id": "tt0120338"}}
+    web_generator.generate_web(two_movies, page_size=1)
+    first_page = (static_dir / "index.html").read_text()
+    second_page = (static_dir / "page-2.html").read_text()
+    assert "12 Angry Men" in first_page and "Titanic" not in first_page
+    assert "href='page-2.html'" in first_page
+    assert "href='index.html'" in second_page
+    assert "loading='lazy'" in second_page
+    assert '"title": "Titanic"' in (static_dir / "data" / "page-2.json").read_text()
+
+    web_generator.generate_web(movies, page_size=1)
+    assert not (static_dir / "page-2.html").exists()
+    assert not (static_dir / "data" / "page-2.json").exists()
+
+
+def test_parallel_build_same_as_serial(static_dir, monkeypatch):
+    many_movies = {f"Movie {index}": {**movies["12 Angry Men"],
+                                      "imdb_id": f"tt{index:07d}"}
+                   for index in range(20)}
+    web_generator.generate_web(many_movies, page_size=8)
+    serial_pages = [(static_dir / name).read_text()
+                    for name in ["index.html", "page-2.html", "page-3.html"]]
+
+    shutil.rmtree("_cache")
+    monkeypatch.setattr(web_generator, "PARALLEL_MIN_PAGES", 2)
+    web_generator.generate_web(many_movies, page_size=8, workers=2)
+    parallel_pages = [(static_dir / name).read_text()
+                      for name in ["index.html", "page-2.html", "page-3.html"]]
+    assert parallel_pages == serial_pages
+
+
+def test_memory_does_not_grow_with_library(static_dir):
+    def measure_peak_memory(size):
+        many_movies = {f"Movie {index}": {**movies["12 Angry Men"],
+                                          "imdb_id": f"tt{index:07d}"}
+                       for index in range(size)}
+        tracemalloc.start()
+        try:
+            web_generator.generate_web(many_movies, page_size=10)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            shutil.rmtree("_cache")
+
+    assert measure_peak_memory(4000) < 1.5 * measure_peak_memory(400)
+
+
+def test_pool_not_started_for_few_changed_pages(static_dir, monkeypatch):
+    many_movies = {f"Movie {index}": {**movies["12 Angry Men"],
+                                      "imdb_id": f"tt{index:07d}"}
+                   for index in range(20)}
+    web_generator.generate_web(many_movies, page_size=8)
+    monkeypatch.setattr(web_generator, "PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(web_generator.concurrent.futures,
+                        "ProcessPoolExecutor", None)
+
+    many_movies["Movie 0"] = {**many_movies["Movie 0"], "note": "new"}
+    web_generator.generate_web(many_movies, page_size=8, workers=2)
+    assert "new" in (static_dir / "index.html").read_text()
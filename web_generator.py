@@ -1,54 +1,306 @@
+import concurrent.futures
+import functools
+import hashlib
+import itertools
+import json
+import math
 import os
 import flags_api_handler
+import metrics
+import poster_cache
 
 NEW_WEB_PATH = os.path.join("_static", "index.html")
+PAGE_PATH = os.path.join("_static", "page-{}.html")
+DATA_SHARD_PATH = os.path.join("_static", "data", "page-{}.json")
+PAGE_SIZE = 100
 TEMPLATE_PATH = os.path.join("_static", "index_template.html")
 TITLE_NAME = "Dima's Project Movie App"
 IMDB_PATH = "https://www.imdb.com/title/"
+PAGES_CACHE_PATH = os.path.join("_cache", "web_pages.json")
+FRAGMENTS_CACHE_PATH = os.path.join("_cache", "pages", "page-{}.json")
+# bump when generate_movie output changes, to drop old cached fragments
+FRAGMENT_CACHE_VERSION = 4
+WRITE_BUFFER_SIZE = 1024 * 1024
+# changed pages are sent to the process pool in batches of that size
+PARALLEL_BATCH_PAGES = 20
+# generating less pages than that in a process pool is slower than serial
+PARALLEL_MIN_PAGES = 10
 
 
-def load_template() -> str:
-    """return html template"""
-    with open(TEMPLATE_PATH, "r") as file:
-        return file.read()
+def load_template_segments() -> tuple:
+    """
+    returns html template split around the movie grid to (prefix, suffix),
+    with the title already filled in. The template is parsed only once
+    as long as the file is not modified.
+    """
+    return _parse_template(TEMPLATE_PATH, os.path.getmtime(TEMPLATE_PATH))
 
 
-def save_website(web_page: str) -> None:
-    """saves generated web"""
-    with open(NEW_WEB_PATH, "w") as file:
-        file.write(web_page)
+@functools.lru_cache(maxsize=1)
+def _parse_template(template_path: str, modified_time: float) -> tuple:
+    """reads and splits html template, cached by its modification time"""
+    with open(template_path, "r") as file:
+        template = file.read().replace("__TEMPLATE_TITLE__", TITLE_NAME)
+    prefix, suffix = template.split("__TEMPLATE_MOVIE_GRID__", 1)
+    return prefix, suffix
 
 
-def generate_web(movies: dict) -> None:
-    """Generate webpage index.html that representing movies data"""
-    generated_web = load_template().replace("__TEMPLATE_TITLE__", TITLE_NAME)
+def load_pages_cache() -> dict:
+    """returns dict of page number to key of the page saved last time"""
+    try:
+        with open(PAGES_CACHE_PATH, "r") as file:
+            cache = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
 
-    # generate html representation of movies
-    generated_movies_html = ""
-    for movie, data in movies.items():
-        generated_movies_html += generate_movie(movie, data)
+    if cache.get("version") != FRAGMENT_CACHE_VERSION:
+        return {}
+    return cache["pages"]
 
-    generated_web = generated_web.replace("__TEMPLATE_MOVIE_GRID__",
-                                          generated_movies_html)
-    save_website(generated_web)
+
+def save_pages_cache(page_keys: dict) -> None:
+    """saves keys of the generated pages"""
+    os.makedirs(os.path.dirname(PAGES_CACHE_PATH), exist_ok=True)
+    with open(PAGES_CACHE_PATH, "w") as file:
+        # json.dumps uses the C encoder, json.dump the slow Python one
+        file.write(json.dumps({"version": FRAGMENT_CACHE_VERSION,
+                               "pages": page_keys}))
+
+
+def load_page_fragments(page_number: int) -> dict:
+    """
+    returns dict of movie title to [digest of movie record, movie html]
+    of the page
+    """
+    try:
+        with open(FRAGMENTS_CACHE_PATH.format(page_number), "r") as file:
+            cache = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+    if cache.get("version") != FRAGMENT_CACHE_VERSION:
+        return {}
+    return cache["movies"]
+
+
+def save_page_fragments(page_number: int, fragments: dict) -> None:
+    """saves movie html fragments of the page"""
+    file_path = FRAGMENTS_CACHE_PATH.format(page_number)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w") as file:
+        file.write(json.dumps({"version": FRAGMENT_CACHE_VERSION,
+                               "movies": fragments}))
+
+
+def get_record_digest(data: dict) -> str:
+    """returns short digest of the movie record, stored with its html"""
+    return hashlib.blake2b(repr(data).encode(), digest_size=8).hexdigest()
+
+
+def get_page_key(page_movies: list, page_number: int, page_count: int,
+                 template_modified_time: float) -> str:
+    """
+    returns key of everything the page is generated from. repr of the
+    movies is much cheaper than dumping them to JSON with sorted keys
+    """
+    page_record = repr((FRAGMENT_CACHE_VERSION, page_number, page_count,
+                        template_modified_time, page_movies))
+    return hashlib.sha256(page_record.encode()).hexdigest()
+
+
+def get_page_path(page_number: int) -> str:
+    """returns path of the page, first page is index.html"""
+    return NEW_WEB_PATH if page_number == 1 else PAGE_PATH.format(page_number)
+
+
+def save_file(file_path: str, segments) -> None:
+    """streams segments into a temporary file, that replaces file_path"""
+    temp_file_path = file_path + ".tmp"
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(temp_file_path, "w", buffering=WRITE_BUFFER_SIZE) as file:
+        for segment in segments:
+            file.write(segment)
+    os.replace(temp_file_path, file_path)
+
+
+@metrics.timed("site_build_duration_seconds")
+def generate_web(movies: dict, page_size: int = PAGE_SIZE,
+                 workers: int = 1, local_posters: bool = False) -> None:
+    """
+    Generate webpages that representing movies data, page_size movies
+    per page: index.html, page-2.html, ... and a JSON data shard for every
+    page in _static/data, used for filtering movies in the browser.
+    A page is skipped without reading or writing any file if its key
+    (its movies, number, count of pages and the template) didn't change.
+    Movies of a changed page that are the same as in its cached fragments
+    are not rendered again. Changed pages are generated in batches and
+    only one batch and its cached fragments are kept in memory, so the
+    memory used besides the movies dict itself doesn't grow with the size
+    of the library.
+    Pages that are no longer needed are removed.
+    With workers > 1 a batch of many changed pages is generated in a pool
+    of processes, every process renders and writes whole pages. The
+    generated files are the same as with a serial build. The pool is not
+    started when only a few pages changed.
+    With local_posters the posters are downloaded to _static/posters
+    and the pages use their local thumbnails.
+    """
+    if local_posters:
+        movies = poster_cache.prefetch_posters(movies)
+
+    saved_keys = load_pages_cache()
+    page_keys = {}
+    page_count = max(1, math.ceil(len(movies) / page_size))
+    changed_pages = find_changed_pages(movies, page_size, page_count,
+                                       saved_keys, page_keys)
+
+    executor = None
+    try:
+        while pages_batch := list(itertools.islice(changed_pages,
+                                                   PARALLEL_BATCH_PAGES)):
+            if workers <= 1 or len(pages_batch) < PARALLEL_MIN_PAGES:
+                for page_number, page_movies in pages_batch:
+                    generate_page(page_number, page_movies, page_count)
+                continue
+
+            # the pool is started only when enough pages changed
+            if executor is None:
+                executor = concurrent.futures.ProcessPoolExecutor(workers)
+            page_numbers, pages_movies = zip(*pages_batch)
+            list(executor.map(generate_page, page_numbers, pages_movies,
+                              [page_count] * len(pages_batch)))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # removing pages of the previous generation that are not needed anymore
+    for page_number in saved_keys.keys() - page_keys.keys():
+        for file_path in (get_page_path(int(page_number)),
+                          DATA_SHARD_PATH.format(page_number),
+                          FRAGMENTS_CACHE_PATH.format(page_number)):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    if page_keys != saved_keys:
+        save_pages_cache(page_keys)
+
+    # bundle the flags used by the movies into a single stylesheet
+    country_codes = {flags_api_handler.get_flag_country_code(data["country"])
+                     for data in movies.values()}
+    flags_api_handler.build_flags_sprite(
+        code for code in country_codes if code)
+
+
+def find_changed_pages(movies: dict, page_size: int, page_count: int,
+                       saved_keys: dict, page_keys: dict):
+    """
+    Yields (page number, page movies) of the pages whose key differs from
+    saved_keys or whose files are missing. Key of every page is stored
+    in page_keys.
+    """
+    template_modified_time = os.path.getmtime(TEMPLATE_PATH)
+    movies_iterator = iter(movies.items())
+    for page_number in range(1, page_count + 1):
+        page_movies = list(itertools.islice(movies_iterator, page_size))
+        page_key = get_page_key(page_movies, page_number, page_count,
+                                template_modified_time)
+        page_keys[str(page_number)] = page_key
+        if saved_keys.get(str(page_number)) != page_key \
+                or not os.path.exists(get_page_path(page_number)) \
+                or not os.path.exists(DATA_SHARD_PATH.format(page_number)):
+            yield page_number, page_movies
+
+
+def generate_page(page_number: int, page_movies: list,
+                  page_count: int) -> None:
+    """
+    Generates the page, its data shard and its cached fragments. Movies
+    that are the same as in the cached fragments of the page are not
+    rendered again. Runs in the pool processes with workers > 1, so only
+    the page movies are sent to the process.
+    """
+    cached_fragments = load_page_fragments(page_number)
+    fragments = {}
+    for movie, data in page_movies:
+        record_digest = get_record_digest(data)
+        cached_fragment = cached_fragments.get(movie)
+        if cached_fragment is not None and cached_fragment[0] == record_digest:
+            fragments[movie] = cached_fragment
+        else:
+            fragments[movie] = [record_digest, generate_movie(movie, data)]
+
+    save_file(get_page_path(page_number),
+              generate_page_segments(page_movies, page_number, page_count,
+                                     fragments))
+    save_file(DATA_SHARD_PATH.format(page_number),
+              [generate_data_shard(page_movies, page_number)])
+    save_page_fragments(page_number, fragments)
+
+
+def generate_page_segments(page_movies: list, page_number: int,
+                           page_count: int, fragments: dict):
+    """
+    Yields html of the page piece by piece: template prefix, movies and
+    template suffix. fragments is dict of movie title to [digest, html].
+    """
+    template_prefix, template_suffix = load_template_segments()
+    page_navigation = generate_page_navigation(page_number, page_count)
+    page_placeholders = {"__TEMPLATE_PAGE_NAV__": page_navigation,
+                         "__TEMPLATE_PAGE_NUMBER__": str(page_number),
+                         "__TEMPLATE_PAGE_COUNT__": str(page_count)}
+    for placeholder, value in page_placeholders.items():
+        template_prefix = template_prefix.replace(placeholder, value)
+        template_suffix = template_suffix.replace(placeholder, value)
+    yield template_prefix
+
+    for movie, _ in page_movies:
+        yield fragments[movie][1]
+
+    yield template_suffix
+
+
+def generate_page_navigation(page_number: int, page_count: int) -> str:
+    """generate html for previous/next pages links"""
+    navigation_html = "<nav class='page-nav'>\n"
+    if page_number > 1:
+        previous_page = os.path.basename(get_page_path(page_number - 1))
+        navigation_html += f"<a href='{previous_page}'>&laquo; Prev</a>\n"
+    navigation_html += f"<span>Page {page_number} of {page_count}</span>\n"
+    if page_number < page_count:
+        next_page = os.path.basename(get_page_path(page_number + 1))
+        navigation_html += f"<a href='{next_page}'>Next &raquo;</a>\n"
+    navigation_html += "</nav>"
+
+    return navigation_html
+
+
+def generate_data_shard(page_movies: list, page_number: int) -> str:
+    """generate JSON with the data of the page movies, used by filter.js"""
+    shard = {"page": page_number,
+             "file_name": os.path.basename(get_page_path(page_number)),
+             "movies": [{"title": movie, "year": data["year"],
+                         "rating": data["rating"],
+                         "country": data["country"],
+                         "note": data.get("note", "")}
+                        for movie, data in page_movies]}
+    return json.dumps(shard)
 
 
 def generate_movie(movie_title, data) -> str:
     """generate html for movie"""
-    movie_html = "<li>\n"
-    movie_html += "<div class ='movie'>\n"
-    movie_html += f"<a href={IMDB_PATH + data['imdb_id']} target='_blank'>"
-    movie_html += f"<img class='movie-poster' src='{data['image']}'" \
-                  f" title='{data.get('note','')}'/>\n"
-    movie_html += f"</a>"
-    movie_html += f"<div class='imdb'><em>IMDb:</em> {data['rating']}</div>\n"
-    flag_url = flags_api_handler.get_flag_html_link(data["country"])
-    if flag_url:
-        movie_html += f"<img class='country_flag' " \
-                      f"src='{flags_api_handler.get_flag_html_link(data['country'])}'/>\n"
-    movie_html += f"<div class='movie-title'>{movie_title}</div>\n"
-    movie_html += f"<div class='movie-year'>{data['year']}</div>\n"
-    movie_html += "</div>\n"
-    movie_html += "</li>\n"
-
-    return movie_html
+    flag_class = flags_api_handler.get_flag_css_class(data["country"])
+    flag_html = f"<span class='country_flag {flag_class}'></span>\n" \
+        if flag_class else ""
+
+    return (f"<li>\n"
+            f"<div class ='movie'>\n"
+            f"<a href={IMDB_PATH + data['imdb_id']} target='_blank'>"
+            f"<img class='movie-poster' src='{data['image']}' loading='lazy'"
+            f" title='{data.get('note', '')}'/>\n"
+            f"</a>"
+            f"<div class='imdb'><em>IMDb:</em> {data['rating']}</div>\n"
+            f"{flag_html}"
+            f"<div class='movie-title'>{movie_title}</div>\n"
+            f"<div class='movie-year'>{data['year']}</div>\n"
+            f"</div>\n"
+            f"</li>\n")